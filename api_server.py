@@ -0,0 +1,365 @@
+"""Headless JSON API for the advisory services.
+
+Serves the same helpers as the Streamlit app to the SMS/IVR gateway and
+partner apps, without rerunning a UI script per request:
+
+    POST /v1/disease                 multipart (image file, crop) or JSON {"image": <base64>, "crop"}
+    POST /v1/soil                    multipart or JSON {"image": <base64>, "description"}; either may be omitted
+    POST /v1/crop-recommendations    JSON {"state", "soil_type", "district", "preferences"}
+    POST /v1/weather                 JSON {"city", "state", "crop", "forecast"} or {"lat", "lon", ...}
+    POST /v1/chat                    JSON {"question"}
+    GET  /healthz, /metrics, /metrics.json
+
+Answers are {"result": text} with status 200, or {"error": text} with 400
+(bad request), 502 (upstream failure), 503 (not configured or overloaded)
+or 504 (deadline). Add ?stream=1 to a POST for a chunked text/plain answer
+written as the model produces it; errors then arrive in-band as text, as
+they do in the UI.
+
+Each worker process runs one event loop: Gemini and weather calls use the
+async helpers, while streams and image decoding run on a thread pool. At
+most API_MAX_CONCURRENCY requests per process execute at once; the rest
+wait up to API_QUEUE_TIMEOUT seconds, then get a 503. With --workers > 1
+the processes share the port through SO_REUSEPORT (Linux), and each serves
+its own /metrics.
+
+    python api_server.py --port 8080 --workers 4
+"""
+import argparse
+import asyncio
+import base64
+import binascii
+import json
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import get_context
+
+from aiohttp import web
+
+from config import (
+    API_HOST, API_MAX_BODY_MB, API_MAX_CONCURRENCY, API_PORT, API_QUEUE_TIMEOUT, API_REQUEST_TIMEOUT,
+    API_THREADS, API_WORKERS, GEMINI_WARMUP, IMAGE_MAX_PIXELS, RECOMMENDATION_STORE_PATH
+)
+from utils.gemini_service import (
+    PROMPT_VERSION,
+    analyze_crop_disease_async,
+    analyze_crop_disease_stream,
+    analyze_soil_quality_async,
+    analyze_soil_quality_stream,
+    chat_with_ai_async,
+    chat_with_ai_stream,
+    gemini_circuit_open,
+    get_crop_recommendations_async,
+    get_crop_recommendations_stream,
+    preprocess_image,
+    warm_up_models
+)
+from utils.metrics import record_error, render_prometheus, snapshot
+from utils.recommendation_store import load_recommendations, lookup_recommendation
+from utils.weather_service import (
+    close_async_http_session,
+    get_forecast,
+    get_forecast_by_coords,
+    get_weather_by_coords,
+    get_weather_data_async,
+    get_weather_recommendations_async,
+    get_weather_recommendations_stream
+)
+
+
+def _status(text):
+    """HTTP status for a helper's answer; the helpers report failures as text"""
+    if text.startswith(("Please set your", "GEMINI_API_KEY missing")):
+        return 503
+    if "temporarily unavailable" in text and text.startswith("Error"):
+        return 503
+    if "timed out" in text and text.startswith("Error"):
+        return 504
+    if text.startswith("Error"):
+        return 502
+    return 200
+
+def _error(status, message):
+    return web.json_response({"error": message}, status=status)
+
+def _answer(text, **extra):
+    status = _status(text)
+    if status != 200:
+        return web.json_response({"error": text, **extra}, status=status)
+    return web.json_response({"result": text, **extra})
+
+async def _payload(request):
+    """Form or JSON fields as a dict; an uploaded or base64 image comes back as bytes under "image" """
+    if request.content_type.startswith("multipart/"):
+        form = await request.post()
+        fields = {}
+        for name, value in form.items():
+            fields[name] = value.file.read() if isinstance(value, web.FileField) else value
+        # A text field would reach Image.open() as a path on this server
+        if "image" in fields and not isinstance(fields["image"], bytes):
+            raise web.HTTPBadRequest(text='{"error": "image must be an uploaded file"}',
+                                     content_type="application/json")
+        return fields
+    body = await request.text()
+    if not body.strip():
+        return {}
+    try:
+        fields = json.loads(body)
+    except json.JSONDecodeError:
+        raise web.HTTPBadRequest(text='{"error": "Body must be JSON or multipart form data"}',
+                                 content_type="application/json")
+    if not isinstance(fields, dict):
+        raise web.HTTPBadRequest(text='{"error": "Body must be a JSON object"}', content_type="application/json")
+    if fields.get("image"):
+        try:
+            fields["image"] = base64.b64decode(fields["image"], validate=True)
+        except (binascii.Error, TypeError):
+            raise web.HTTPBadRequest(text='{"error": "image must be base64"}', content_type="application/json")
+    return fields
+
+def _text(fields, name):
+    value = fields.get(name, "")
+    return value.strip() if isinstance(value, str) else ""
+
+async def _in_thread(request, fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(request.app["executor"], fn, *args)
+
+async def _prepare_image(request, data):
+    """Decode and downscale uploaded bytes off the event loop; returns (image, error response)"""
+    message = f"Could not read image; upload a JPEG or PNG photo under {IMAGE_MAX_PIXELS // 1_000_000} MP"
+    if not isinstance(data, bytes):
+        return None, _error(400, message)
+    try:
+        return await _in_thread(request, preprocess_image, data), None
+    except Exception as e:
+        # The decoder's message is not echoed; it can describe server-side state
+        record_error(e)
+        return None, _error(400, message)
+
+def _wants_stream(request):
+    return request.query.get("stream", "") in ("1", "true")
+
+async def _stream(request, chunks):
+    """Relay a blocking chunk generator as a chunked text/plain response"""
+    response = web.StreamResponse(headers={"Content-Type": "text/plain; charset=utf-8"})
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+    try:
+        while True:
+            chunk = await _in_thread(request, next, chunks, None)
+            if chunk is None:
+                break
+            await response.write(chunk.encode("utf-8"))
+    finally:
+        chunks.close()
+    await response.write_eof()
+    return response
+
+
+async def disease(request):
+    fields = await _payload(request)
+    if not fields.get("image"):
+        return _error(400, "image is required")
+    image, error = await _prepare_image(request, fields["image"])
+    # A Response is an empty mapping, so it is falsy; compare with None
+    if error is not None:
+        return error
+    crop_name = _text(fields, "crop")
+    if _wants_stream(request):
+        return await _stream(request, analyze_crop_disease_stream(image, crop_name))
+    return _answer(await analyze_crop_disease_async(image, crop_name, timeout=API_REQUEST_TIMEOUT))
+
+async def soil(request):
+    fields = await _payload(request)
+    description = _text(fields, "description")
+    image = None
+    if fields.get("image"):
+        image, error = await _prepare_image(request, fields["image"])
+        if error is not None:
+            return error
+    if image is None and not description:
+        return _error(400, "image or description is required")
+    if _wants_stream(request):
+        return await _stream(request, analyze_soil_quality_stream(image=image, description=description))
+    return _answer(await analyze_soil_quality_async(image, description, timeout=API_REQUEST_TIMEOUT))
+
+async def crop_recommendations(request):
+    fields = await _payload(request)
+    state, soil_type = _text(fields, "state"), _text(fields, "soil_type")
+    district, preferences = _text(fields, "district"), _text(fields, "preferences")
+    if not state or not soil_type:
+        return _error(400, "state and soil_type are required")
+
+    # Blank preferences are served from the offline precomputed store, as in the app
+    table = request.app["precomputed"]
+    if not preferences:
+        precomputed = lookup_recommendation(table, state, soil_type, district)
+        if precomputed:
+            return _answer(precomputed, precomputed=True)
+    if gemini_circuit_open():
+        # Gemini is failing fast: a precomputed answer that ignores preferences or district beats an error
+        precomputed = (lookup_recommendation(table, state, soil_type, district)
+                       or lookup_recommendation(table, state, soil_type))
+        if precomputed:
+            return _answer(precomputed, precomputed=True, degraded=True)
+
+    region = f"{district}, {state}" if district else state
+    if _wants_stream(request):
+        return await _stream(request, get_crop_recommendations_stream(region, soil_type, preferences))
+    return _answer(await get_crop_recommendations_async(region, soil_type, preferences, timeout=API_REQUEST_TIMEOUT))
+
+async def weather(request):
+    fields = await _payload(request)
+    city, state, crop_name = _text(fields, "city"), _text(fields, "state"), _text(fields, "crop")
+    coords = fields.get("lat") is not None and fields.get("lon") is not None
+    if coords:
+        try:
+            lat, lon = float(fields["lat"]), float(fields["lon"])
+        except (TypeError, ValueError):
+            return _error(400, "lat and lon must be numbers")
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return _error(400, "lat must be within [-90, 90] and lon within [-180, 180]")
+        weather_data, error = await _in_thread(request, get_weather_by_coords, lat, lon)
+    elif city:
+        weather_data, error = await get_weather_data_async(city, state, timeout=API_REQUEST_TIMEOUT)
+    else:
+        return _error(400, "city or lat/lon is required")
+    if error:
+        return _error(404 if error.startswith("Error: 404") else _status(error), error)
+
+    forecast = None
+    if fields.get("forecast"):
+        if coords:
+            forecast, _ = await _in_thread(request, get_forecast_by_coords, lat, lon)
+        else:
+            forecast, _ = await _in_thread(request, get_forecast, city, state)
+
+    if _wants_stream(request):
+        return await _stream(request, get_weather_recommendations_stream(crop_name, weather_data, forecast))
+    advice = await get_weather_recommendations_async(crop_name, weather_data, API_REQUEST_TIMEOUT, forecast)
+    extra = {"weather": weather_data}
+    if forecast is not None:
+        extra["forecast"] = forecast.summary()
+    # Rule-based advice stands in when the AI is unavailable, so this always succeeds
+    return web.json_response({"result": advice, **extra})
+
+async def chat(request):
+    fields = await _payload(request)
+    question = _text(fields, "question")
+    if not question:
+        return _error(400, "question is required")
+    if _wants_stream(request):
+        return await _stream(request, chat_with_ai_stream(question))
+    return _answer(await chat_with_ai_async(question, timeout=API_REQUEST_TIMEOUT))
+
+async def healthz(request):
+    return web.json_response({"ok": True})
+
+async def metrics(request):
+    return web.Response(
+        body=render_prometheus().encode("utf-8"),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+    )
+
+async def metrics_json(request):
+    return web.json_response(snapshot())
+
+
+@web.middleware
+async def _admission(request, handler):
+    """Bound the requests executing at once; queue the rest briefly, then shed load"""
+    if not request.path.startswith("/v1/"):
+        return await handler(request)
+    gate = request.app["gate"]
+    try:
+        await asyncio.wait_for(gate.acquire(), API_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        return web.json_response({"error": "Server busy, retry shortly"}, status=503, headers={"Retry-After": "1"})
+    try:
+        return await handler(request)
+    finally:
+        gate.release()
+
+async def _startup(app):
+    app["gate"] = asyncio.Semaphore(app["max_concurrency"])
+    if GEMINI_WARMUP:
+        # The SDK loads lazily; pay for it before the first request rather than during it
+        await asyncio.get_running_loop().run_in_executor(app["executor"], warm_up_models)
+
+async def _cleanup(app):
+    await close_async_http_session()
+    app["executor"].shutdown(wait=False, cancel_futures=True)
+
+def make_app(max_concurrency=API_MAX_CONCURRENCY, threads=API_THREADS, max_body_mb=API_MAX_BODY_MB):
+    """Build the aiohttp application; bodies over max_body_mb are refused with 413"""
+    app = web.Application(client_max_size=int(max_body_mb * 1024 * 1024), middlewares=[_admission])
+    app["max_concurrency"] = max_concurrency
+    app["executor"] = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="api")
+    app["precomputed"] = load_recommendations(RECOMMENDATION_STORE_PATH, PROMPT_VERSION)
+    app.on_startup.append(_startup)
+    app.on_cleanup.append(_cleanup)
+    app.router.add_post("/v1/disease", disease)
+    app.router.add_post("/v1/soil", soil)
+    app.router.add_post("/v1/crop-recommendations", crop_recommendations)
+    app.router.add_post("/v1/weather", weather)
+    app.router.add_post("/v1/chat", chat)
+    app.router.add_get("/healthz", healthz)
+    app.router.add_get("/metrics", metrics)
+    app.router.add_get("/metrics.json", metrics_json)
+    return app
+
+
+def _serve_worker(host, port, options, initializer, reuse_port):
+    if initializer is not None:
+        initializer()
+    web.run_app(make_app(**options), host=host, port=port, reuse_port=reuse_port, print=None, access_log=None)
+
+def serve(host=API_HOST, port=API_PORT, workers=API_WORKERS, initializer=None, **options):
+    """Run the API in `workers` processes until interrupted.
+
+    initializer, if given, is called in every worker process before it starts
+    serving; it must be picklable when workers > 1.
+    """
+    if workers <= 1:
+        _serve_worker(host, port, options, initializer, False)
+        return
+    # spawn, so no worker inherits another's event loop, sessions or locks
+    context = get_context("spawn")
+    processes = [
+        context.Process(target=_serve_worker, args=(host, port, options, initializer, True), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    # Stopping the parent with SIGTERM stops its workers too
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="worker processes sharing the port")
+    parser.add_argument("--threads", type=int, default=API_THREADS, help="threads per process for streams and images")
+    parser.add_argument("--max-concurrency", type=int, default=API_MAX_CONCURRENCY,
+                        help="requests executing at once per process")
+    parser.add_argument("--max-body-mb", type=float, default=API_MAX_BODY_MB)
+    args = parser.parse_args()
+
+    print(f"Serving on http://{args.host}:{args.port} with {args.workers} worker(s)", file=sys.stderr)
+    serve(args.host, args.port, args.workers, threads=args.threads,
+          max_concurrency=args.max_concurrency, max_body_mb=args.max_body_mb)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
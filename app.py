@@ -1,18 +1,16 @@
 import streamlit as st
-from PIL import Image
 import io
-from utils.gemini_service import (
-    analyze_crop_disease,
-    analyze_soil_quality,
-    get_crop_recommendations,
-    chat_with_ai
+import json
+import sqlite3
+import threading
+import uuid
+# Service modules are imported by the page that uses them, so a new replica
+# renders its first page without loading the Gemini SDK, pandas or HTTP clients
+from utils.metrics import render_prometheus, snapshot, start_metrics_server
+from config import (
+    ALL_CROPS, INDIAN_STATES, SOIL_TYPES, GEMINI_WARMUP, RECOMMENDATION_STORE_PATH, METRICS_PORT, ADMIN_TOKEN,
+    CHAT_PAGE_SIZE, CHAT_HISTORY_CAP, CHAT_ARCHIVE_PATH, CHAT_ARCHIVE_TTL
 )
-from utils.weather_service import (
-    get_weather_data,
-    get_weather_recommendations,
-    format_weather_info
-)
-from config import ALL_CROPS, INDIAN_STATES
 
 
 st.set_page_config(
@@ -23,6 +21,115 @@ st.set_page_config(
 )
 
 
+@st.cache_resource
+def gemini_service():
+    """Import the Gemini service and configure the SDK once per process"""
+    from utils import gemini_service as service
+    service.configure_gemini()
+    return service
+
+
+def _warm_up_models():
+    from utils.gemini_service import warm_up_models
+    warm_up_models()
+
+
+@st.cache_resource
+def _warm_up_gemini():
+    # Load the SDK off the script thread, so the first page doesn't wait for it
+    thread = threading.Thread(target=_warm_up_models, name="gemini-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+if GEMINI_WARMUP:
+    _warm_up_gemini()
+
+
+@st.cache_resource
+def _metrics_server():
+    """One /metrics endpoint per process, shared by every session"""
+    try:
+        return start_metrics_server(METRICS_PORT)
+    except OSError:
+        # Port taken, e.g. by another replica on the same host
+        return None
+
+if METRICS_PORT:
+    _metrics_server()
+
+
+def render_stream(chunks):
+    """Render streamed text progressively in an info box and return the full text"""
+    placeholder = st.empty()
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        placeholder.info(text)
+    return text
+
+
+@st.cache_resource
+def precomputed_recommendations():
+    """In-memory snapshot of the precomputed diversification store"""
+    from utils.recommendation_store import load_recommendations
+    return load_recommendations(RECOMMENDATION_STORE_PATH, gemini_service().PROMPT_VERSION)
+
+
+@st.cache_resource
+def chat_archive():
+    """Process-wide spill-over store for long chat histories; None if it can't be opened"""
+    from utils.chat_archive import ChatArchive
+    try:
+        return ChatArchive(CHAT_ARCHIVE_PATH, ttl=CHAT_ARCHIVE_TTL)
+    except (sqlite3.Error, OSError):
+        return None
+
+
+def append_chat(*messages):
+    """Add messages to the session's history, spilling the oldest to the archive past CHAT_HISTORY_CAP"""
+    history = st.session_state.chat_history
+    history.extend(messages)
+    if len(history) <= CHAT_HISTORY_CAP:
+        return
+    # Spill down to half the cap, so the archive is written once per many messages
+    spill = len(history) - CHAT_HISTORY_CAP // 2
+    archive = chat_archive()
+    if archive is not None:
+        try:
+            archive.append(st.session_state.chat_session_id, st.session_state.chat_spilled, history[:spill])
+        except sqlite3.Error:
+            # Drop the oldest messages rather than let the session grow without bound
+            pass
+    del history[:spill]
+    st.session_state.chat_spilled += spill
+
+
+def visible_chat():
+    """The latest chat_visible messages, reading older pages back from the archive on demand"""
+    history = st.session_state.chat_history
+    wanted = st.session_state.chat_visible
+    if wanted <= len(history):
+        return history[len(history) - wanted:]
+    spilled = st.session_state.chat_spilled
+    archive = chat_archive()
+    older = []
+    if spilled and archive is not None:
+        try:
+            older = archive.page(st.session_state.chat_session_id, max(0, spilled - (wanted - len(history))), spilled)
+        except sqlite3.Error:
+            older = []
+    return older + history
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def prepare_upload(data):
+    """Downscale and re-encode an uploaded photo once per distinct file"""
+    try:
+        return gemini_service().preprocess_image(data), None
+    except Exception as e:
+        return None, f"Could not read image: {str(e)}"
+
+
 st.markdown("""
     <style>
     .main-header {
@@ -180,7 +287,14 @@ st.markdown("### Empowering Indian Farmers with AI-Powered Agricultural Solution
 
 
 if "chat_history" not in st.session_state:
+    # Only the latest CHAT_HISTORY_CAP messages; older ones are in the chat archive
     st.session_state.chat_history = []
+    st.session_state.chat_spilled = 0
+    st.session_state.chat_visible = CHAT_PAGE_SIZE
+    st.session_state.chat_session_id = uuid.uuid4().hex
+if "conversation" not in st.session_state:
+    from utils.conversation import Conversation
+    st.session_state.conversation = Conversation()
 if "selected_page" not in st.session_state:
     st.session_state.selected_page = "🏠 Home"
 
@@ -188,6 +302,9 @@ if "selected_page" not in st.session_state:
 st.sidebar.title("🌾 Navigation")
 page_options = ["🏠 Home", "🔍 Disease Detection", "🌦️ Weather Recommendations", "🌱 Soil Analysis", 
                 "🔄 Crop Diversification", "💬 Ask Expert"]
+# Hidden unless the URL carries ?admin=<ADMIN_TOKEN>
+if ADMIN_TOKEN and st.query_params.get("admin") == ADMIN_TOKEN:
+    page_options.append("🛠️ Admin")
 
 try:
     default_index = page_options.index(st.session_state.selected_page)
@@ -276,29 +393,59 @@ if page == "🏠 Home":
 
 elif page == "🔍 Disease Detection":
     st.header("🔍 Crop Disease & Pest Detection")
-    st.markdown("Upload an image of your crop to identify diseases, pests, and get treatment recommendations.")
+    st.markdown("Upload images of your crop to identify diseases, pests, and get treatment recommendations.")
     
     crop_name = st.selectbox("Select Crop Type (Optional)", [""] + ALL_CROPS)
     
-    uploaded_file = st.file_uploader(
-        "Upload Crop Image",
+    uploaded_files = st.file_uploader(
+        "Upload Crop Image(s)",
         type=["jpg", "jpeg", "png"],
-        help="Upload a clear image of the affected crop part"
+        accept_multiple_files=True,
+        help="Upload a clear image of the affected crop part, or many images from a field visit"
     )
     
-    if uploaded_file is not None:
-        image = Image.open(uploaded_file)
-        st.image(image, caption="Uploaded Image", width=500)
+    if len(uploaded_files) == 1:
+        image, error = prepare_upload(uploaded_files[0].getvalue())
         
-        if st.button("🔍 Analyze Disease"):
-            with st.spinner("Analyzing image with AI..."):
-                result = analyze_crop_disease(image, crop_name)
-                st.success("Analysis Complete!")
+        if error:
+            st.error(error)
+        else:
+            st.image(image["data"], caption="Uploaded Image", width=500)
+            
+            if st.button("🔍 Analyze Disease"):
                 st.markdown("### Analysis Results:")
-                st.info(result)
+                with st.spinner("Analyzing image with AI..."):
+                    render_stream(gemini_service().analyze_crop_disease_stream(image, crop_name))
+                st.success("Analysis Complete!")
+    
+    elif len(uploaded_files) > 1:
+        st.caption(f"{len(uploaded_files)} images selected")
+        
+        if st.button("🔍 Analyze All Images"):
+            st.markdown("### Analysis Results:")
+            progress = st.progress(0.0, text="Starting analysis...")
+            
+            # Raw bytes go to the workers so preprocessing also runs in parallel
+            images = [uploaded_file.getvalue() for uploaded_file in uploaded_files]
+            for done, (index, result) in enumerate(gemini_service().analyze_crop_disease_batch(images, crop_name), 1):
+                progress.progress(done / len(images), text=f"Analyzed {done} of {len(images)} images")
+                with st.expander(f"📷 {uploaded_files[index].name}"):
+                    st.info(result)
+            
+            progress.empty()
+            st.success(f"Analysis Complete! {len(images)} images analyzed.")
 
 
 elif page == "🌦️ Weather Recommendations":
+    from utils.gazetteer import get_gazetteer
+    from utils.weather_service import (
+        get_weather_data,
+        get_forecast,
+        get_weather_recommendations_stream,
+        format_weather_info,
+        format_forecast_info
+    )
+    
     st.header("🌦️ Weather-Based Recommendations")
     st.markdown("Get weather-specific planting and care recommendations for your crops.")
     
@@ -307,6 +454,18 @@ elif page == "🌦️ Weather Recommendations":
     with col1:
         city = st.text_input("City Name", placeholder="e.g., Mumbai")
         state = st.selectbox("State", [""] + INDIAN_STATES)
+        
+        if city and not get_gazetteer().resolve(city, state):
+            places = get_gazetteer().search(city, state)
+            if places:
+                # Suggestions only replace the typed city when the farmer picks one explicitly
+                place = st.selectbox(
+                    "Matching places",
+                    [None] + places,
+                    format_func=lambda p: f"Use “{city}” as entered" if p is None else f"{p.name}, {p.state}"
+                )
+                if place is not None:
+                    city, state = place.name, place.state
     
     with col2:
         crop_name = st.selectbox("Select Crop", [""] + ALL_CROPS)
@@ -323,17 +482,19 @@ elif page == "🌦️ Weather Recommendations":
                 elif weather_data:
                     st.success("Weather data retrieved!")
                     
+                    forecast, _ = get_forecast(city, state)
+                    
                     col1, col2 = st.columns(2)
                     
                     with col1:
                         st.markdown("### Current Weather")
                         st.markdown(format_weather_info(weather_data))
+                        st.markdown(format_forecast_info(forecast))
                     
                     with col2:
                         if crop_name:
                             st.markdown("### Crop-Specific Recommendations")
-                            recommendations = get_weather_recommendations(crop_name, weather_data)
-                            st.info(recommendations)
+                            render_stream(get_weather_recommendations_stream(crop_name, weather_data, forecast))
                         else:
                             st.info("Select a crop to get specific recommendations")
 
@@ -352,15 +513,18 @@ elif page == "🌱 Soil Analysis":
         )
         
         if uploaded_file is not None:
-            image = Image.open(uploaded_file)
-            st.image(image, caption="Soil Image", width=500)
+            image, error = prepare_upload(uploaded_file.getvalue())
             
-            if st.button("Analyze Soil"):
-                with st.spinner("Analyzing soil quality..."):
-                    result = analyze_soil_quality(image=image)
-                    st.success("Analysis Complete!")
+            if error:
+                st.error(error)
+            else:
+                st.image(image["data"], caption="Soil Image", width=500)
+                
+                if st.button("Analyze Soil"):
                     st.markdown("### Soil Analysis Results:")
-                    st.info(result)
+                    with st.spinner("Analyzing soil quality..."):
+                        render_stream(gemini_service().analyze_soil_quality_stream(image=image))
+                    st.success("Analysis Complete!")
     
     else:
         description = st.text_area(
@@ -371,17 +535,18 @@ elif page == "🌱 Soil Analysis":
         
         if st.button("Analyze Soil"):
             if description:
+                st.markdown("### Soil Analysis Results:")
                 with st.spinner("Analyzing soil description..."):
-                    result = analyze_soil_quality(description=description)
-                    st.success("Analysis Complete!")
-                    st.markdown("### Soil Analysis Results:")
-                    st.info(result)
+                    render_stream(gemini_service().analyze_soil_quality_stream(description=description))
+                st.success("Analysis Complete!")
             else:
                 st.error("Please enter a soil description")
 
 
 
 elif page == "🔄 Crop Diversification":
+    from utils.recommendation_store import lookup_recommendation
+    
     st.header("🔄 Crop Diversification Recommendations")
     st.markdown("Get AI-powered suggestions for diversifying your crops based on your region and soil.")
     
@@ -392,10 +557,7 @@ elif page == "🔄 Crop Diversification":
         district = st.text_input("District/City", placeholder="e.g., Nashik")
     
     with col2:
-        soil_type = st.selectbox(
-            "Soil Type",
-            ["", "Loamy", "Clayey", "Sandy", "Red Soil", "Black Soil", "Alluvial", "Other"]
-        )
+        soil_type = st.selectbox("Soil Type", [""] + SOIL_TYPES)
         preferences = st.text_input("Preferences (Optional)", placeholder="e.g., prefer vegetables, low water requirement")
     
     if st.button("Get Recommendations"):
@@ -403,11 +565,25 @@ elif page == "🔄 Crop Diversification":
             st.error("Please fill in State and Soil Type")
         else:
             region = f"{district}, {state}" if district else state
-            with st.spinner("Generating crop diversification recommendations..."):
-                recommendations = get_crop_recommendations(region, soil_type, preferences)
-                st.success("Recommendations Ready!")
-                st.markdown("### Diversification Recommendations:")
-                st.info(recommendations)
+            st.markdown("### Diversification Recommendations:")
+            
+            # Blank preferences are served from the offline precomputed store
+            precomputed = None
+            if not preferences.strip():
+                precomputed = lookup_recommendation(precomputed_recommendations(), state, soil_type, district)
+            if not precomputed and gemini_service().gemini_circuit_open():
+                # Gemini is failing fast: a precomputed answer that ignores preferences or district beats an error
+                precomputed = (lookup_recommendation(precomputed_recommendations(), state, soil_type, district)
+                               or lookup_recommendation(precomputed_recommendations(), state, soil_type))
+                if precomputed:
+                    st.warning("AI recommendations are temporarily unavailable; showing general recommendations for your state and soil.")
+            
+            if precomputed:
+                st.info(precomputed)
+            else:
+                with st.spinner("Generating crop diversification recommendations..."):
+                    render_stream(gemini_service().get_crop_recommendations_stream(region, soil_type, preferences))
+            st.success("Recommendations Ready!")
 
 
 elif page == "💬 Ask Expert":
@@ -415,12 +591,20 @@ elif page == "💬 Ask Expert":
     st.markdown("Chat with our AI expert for any agricultural questions.")
     
     
-    for i, (role, message) in enumerate(st.session_state.chat_history):
-        if role == "user":
-            st.markdown(f"**You:** {message}")
-        else:
-            st.markdown(f"**Krishi Mitra:** {message}")
-        st.markdown("---")
+    total = st.session_state.chat_spilled + len(st.session_state.chat_history)
+    messages = visible_chat()
+    if total > len(messages):
+        if st.button(f"⬆️ Load older messages ({total - len(messages)} more)"):
+            st.session_state.chat_visible += CHAT_PAGE_SIZE
+            st.rerun()
+    
+    # One element for the whole window, so reruns cost the same however long the chat is
+    if messages:
+        st.markdown("".join(
+            f"**{'You' if role == 'user' else 'Krishi Mitra'}:** {message}\n\n---\n\n" for role, message in messages
+        ))
+    # The pending exchange streams here, below the history rather than inside the narrow Send column
+    pending = st.container()
     
     
     question = st.text_input("Ask your question:", placeholder="e.g., How to prevent aphids on tomato plants?")
@@ -429,18 +613,72 @@ elif page == "💬 Ask Expert":
     with col1:
         if st.button("Send"):
             if question:
-                with st.spinner("Thinking..."):
-                    response = chat_with_ai(question)
-                    st.session_state.chat_history.append(("user", question))
-                    st.session_state.chat_history.append(("assistant", response))
+                service = gemini_service()
+                with pending, st.spinner("Thinking..."):
+                    st.markdown(f"**You:** {question}")
+                    failures = []
+                    response = render_stream(
+                        service.chat_with_ai_stream(question, st.session_state.conversation, failures)
+                    )
+                    append_chat(("user", question), ("assistant", response))
+                    if not failures:
+                        # Folding older turns into the summary calls Gemini; do it off the script thread
+                        st.session_state.conversation.add(
+                            question, response, service.summarize_conversation, background=True
+                        )
                     st.rerun()
             else:
                 st.error("Please enter a question")
     
     with col2:
         if st.button("Clear Chat"):
+            archive = chat_archive()
+            if st.session_state.chat_spilled and archive is not None:
+                archive.forget(st.session_state.chat_session_id)
             st.session_state.chat_history = []
+            st.session_state.chat_spilled = 0
+            st.session_state.chat_visible = CHAT_PAGE_SIZE
+            st.session_state.conversation.clear()
             st.rerun()
 
 
-
+elif page == "🛠️ Admin":
+    st.header("🛠️ Service Metrics")
+    st.markdown("Counters and latencies for this server process since it started.")
+    
+    metrics = snapshot()
+    
+    st.subheader("Helper and upstream latency")
+    latency_rows = [
+        {
+            "metric": h["name"],
+            **h["labels"],
+            "calls": h["count"],
+            "mean_ms": round(h["mean"] * 1000, 2) if h["mean"] is not None else None,
+            "p50_ms": h["p50"] * 1000,
+            "p95_ms": h["p95"] * 1000,
+            "p99_ms": h["p99"] * 1000
+        }
+        for h in metrics["histograms"]
+    ]
+    if latency_rows:
+        st.dataframe(latency_rows, use_container_width=True)
+    else:
+        st.info("No calls recorded yet.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Counters")
+        st.dataframe([{"metric": c["name"], **c["labels"], "value": c["value"]} for c in metrics["counters"]],
+                     use_container_width=True)
+    with col2:
+        st.subheader("Caches and rate limits")
+        st.dataframe([{"metric": g["name"], **g["labels"], "value": g["value"]} for g in metrics["gauges"]],
+                     use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download Prometheus text", render_prometheus(), file_name="metrics.prom", mime="text/plain")
+    with col2:
+        st.download_button("Download JSON", json.dumps(metrics, indent=2), file_name="metrics.json",
+                           mime="application/json")
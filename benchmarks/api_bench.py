@@ -0,0 +1,281 @@
+"""Throughput of the headless API server against the same work driven through app.py.
+
+Both targets answer the same request mix (expert chat, weather advice,
+crop diversification and soil description, each request distinct so
+nothing is served from cache) with OpenWeather and Gemini replaced by the
+local stubs. The API target starts api_server.py with --workers processes
+and drives it with --concurrency keep-alive connections. The app target
+runs each request as a fresh Streamlit session through AppTest (load the
+page, navigate, fill the form, submit), spread over --concurrency worker
+processes, which is how many sessions a server replica would rerun in
+parallel. Run from the repository root:
+
+    python -m benchmarks.api_bench --requests 200 --concurrency 16 --workers 2 --out benchmarks/results/api.json
+    python -m benchmarks.api_bench --targets api --gemini-latency 0.5
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import socket
+import sys
+import time
+import uuid
+from multiprocessing import get_context
+
+import aiohttp
+import numpy as np
+
+from benchmarks.stubs import install_fake_gemini, start_weather_stub
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+KINDS = ("chat", "weather", "crop_recommendations", "soil")
+
+
+def _workload(count, salt):
+    """[(kind, fields)]; fields are the API body and also fill the app's form"""
+    from config import ALL_CROPS
+
+    work = []
+    for i in range(count):
+        kind = KINDS[i % len(KINDS)]
+        if kind == "chat":
+            fields = {"question": f"How do I control aphids on mustard? ({salt}-{i})"}
+        elif kind == "weather":
+            fields = {"city": "Nashik", "state": "Maharashtra", "crop": ALL_CROPS[(i // len(KINDS)) % len(ALL_CROPS)],
+                      "forecast": True}
+        elif kind == "crop_recommendations":
+            fields = {"state": "Maharashtra", "district": "Nashik", "soil_type": "Black Soil",
+                      "preferences": f"low water requirement ({salt}-{i})"}
+        else:
+            fields = {"description": f"Red soil, sandy texture, low organic matter ({salt}-{i})"}
+        work.append((kind, fields))
+    return work
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _install_fakes(gemini_latency, output_tokens):
+    install_fake_gemini(latency=gemini_latency, output_tokens=output_tokens)
+
+
+def _serve(port, workers, gemini_latency, output_tokens):
+    import api_server
+
+    api_server.serve("127.0.0.1", port, workers,
+                     initializer=functools.partial(_install_fakes, gemini_latency, output_tokens))
+
+
+async def _wait_ready(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(f"{base_url}/healthz") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("API server did not start")
+            await asyncio.sleep(0.1)
+
+
+async def _drive_api(base_url, work, concurrency):
+    paths = {"chat": "/v1/chat", "weather": "/v1/weather",
+             "crop_recommendations": "/v1/crop-recommendations", "soil": "/v1/soil"}
+    records = []
+    pending = iter(work)
+
+    async def client(session):
+        for kind, fields in pending:
+            start = time.perf_counter()
+            try:
+                async with session.post(base_url + paths[kind], json=fields) as response:
+                    await response.read()
+                    status = response.status
+            except aiohttp.ClientError as e:
+                status = type(e).__name__
+            records.append((kind, time.perf_counter() - start, status))
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+        return records, time.perf_counter() - start
+
+
+def run_api(args, work):
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = get_context("spawn").Process(
+        target=_serve, args=(port, args.workers, args.gemini_latency, args.output_tokens)
+    )
+    server.start()
+    try:
+        asyncio.run(_wait_ready(base_url))
+        records, wall = asyncio.run(_drive_api(base_url, work, args.concurrency))
+    finally:
+        server.terminate()
+        server.join()
+    return records, wall
+
+
+def _app_request(AppTest, kind, fields, timeout):
+    """One fresh session: load, navigate, fill the form and submit; returns the exception count"""
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+
+    def widget(widgets, label):
+        return next(w for w in widgets if w.label == label)
+
+    if kind == "chat":
+        at.sidebar.radio[0].set_value("💬 Ask Expert").run()
+        widget(at.text_input, "Ask your question:").input(fields["question"]).run()
+        widget(at.button, "Send").click().run()
+    elif kind == "weather":
+        at.sidebar.radio[0].set_value("🌦️ Weather Recommendations").run()
+        widget(at.text_input, "City Name").input(fields["city"])
+        widget(at.selectbox, "State").set_value(fields["state"])
+        widget(at.selectbox, "Select Crop").set_value(fields["crop"]).run()
+        widget(at.button, "Get Weather Recommendations").click().run()
+    elif kind == "crop_recommendations":
+        at.sidebar.radio[0].set_value("🔄 Crop Diversification").run()
+        widget(at.selectbox, "State").set_value(fields["state"])
+        widget(at.text_input, "District/City").input(fields["district"])
+        widget(at.selectbox, "Soil Type").set_value(fields["soil_type"])
+        widget(at.text_input, "Preferences (Optional)").input(fields["preferences"]).run()
+        widget(at.button, "Get Recommendations").click().run()
+    else:
+        at.sidebar.radio[0].set_value("🌱 Soil Analysis").run()
+        widget(at.radio, "Analysis Method").set_value("Text Description").run()
+        widget(at.text_area, "Describe your soil").input(fields["description"]).run()
+        widget(at.button, "Analyze Soil").click().run()
+    return len(at.exception)
+
+
+def _app_worker(job):
+    work, gemini_latency, output_tokens, timeout = job
+    from streamlit.testing.v1 import AppTest
+
+    _install_fakes(gemini_latency, output_tokens)
+    records = []
+    for kind, fields in work:
+        start = time.perf_counter()
+        try:
+            status = "exception" if _app_request(AppTest, kind, fields, timeout) else 200
+        except Exception as e:
+            status = type(e).__name__
+        records.append((kind, time.perf_counter() - start, status))
+    return records
+
+
+def run_app(args, work):
+    processes = max(1, min(args.concurrency, len(work)))
+    jobs = [(work[i::processes], args.gemini_latency, args.output_tokens, args.timeout) for i in range(processes)]
+    start = time.perf_counter()
+    with get_context("spawn").Pool(processes) as pool:
+        records = [record for share in pool.map(_app_worker, jobs) for record in share]
+    return records, time.perf_counter() - start
+
+
+def summarize(records, wall):
+    def stats(rows):
+        ms = np.array([seconds for _, seconds, _ in rows]) * 1000
+        return {
+            "requests": len(rows),
+            "errors": sum(1 for _, _, status in rows if status != 200),
+            "p50_ms": round(float(np.percentile(ms, 50)), 2),
+            "p95_ms": round(float(np.percentile(ms, 95)), 2),
+            "p99_ms": round(float(np.percentile(ms, 99)), 2),
+            "mean_ms": round(float(ms.mean()), 2)
+        }
+
+    summary = stats(records)
+    summary["wall_s"] = round(wall, 2)
+    summary["throughput_rps"] = round(len(records) / wall, 1)
+    summary["by_kind"] = {kind: stats([r for r in records if r[0] == kind]) for kind in KINDS}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--targets", nargs="+", choices=["api", "app"], default=["api", "app"])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16, help="API connections, or app worker processes")
+    parser.add_argument("--workers", type=int, default=1, help="API server worker processes")
+    parser.add_argument("--weather-latency", type=float, default=0.02, help="simulated OpenWeather latency (s)")
+    parser.add_argument("--gemini-latency", type=float, default=0.2, help="simulated Gemini latency (s)")
+    parser.add_argument("--output-tokens", type=int, default=400)
+    parser.add_argument("--timeout", type=float, default=30, help="per-rerun AppTest timeout (s)")
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    stub, base_url = start_weather_stub(latency=args.weather_latency)
+    # Spawned server and app processes inherit this environment before importing config
+    os.environ.update({
+        "OPENWEATHER_API_KEY": "benchmark",
+        "OPENWEATHER_BASE_URL": base_url,
+        "WEATHER_RPM": "0",
+        "GEMINI_API_KEY": "benchmark",
+        "GEMINI_RPM": "0",
+        "GEMINI_TPM": "0",
+        "GEMINI_WARMUP": "0",
+        "RESPONSE_CACHE_ENABLED": "0"
+    })
+    work = _workload(args.requests, uuid.uuid4().hex[:8])
+
+    results = {}
+    runners = {"api": run_api, "app": run_app}
+    try:
+        for target in args.targets:
+            try:
+                records, wall = runners[target](args, work)
+            except Exception as e:
+                results[target] = {"error": f"{type(e).__name__}: {e}"}
+                print(f"{target}: failed: {e}", file=sys.stderr)
+                continue
+            results[target] = summarize(records, wall)
+            print(
+                f"{target:4} {results[target]['throughput_rps']:>8.1f} req/s "
+                f"p50={results[target]['p50_ms']:.1f}ms p95={results[target]['p95_ms']:.1f}ms "
+                f"errors={results[target]['errors']}",
+                file=sys.stderr
+            )
+    finally:
+        stub.shutdown()
+
+    if "throughput_rps" in results.get("api", {}) and "throughput_rps" in results.get("app", {}):
+        results["api_speedup"] = round(results["api"]["throughput_rps"] / results["app"]["throughput_rps"], 2)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "upstream_requests": stub.requests,
+            "settings": {k: v for k, v in vars(args).items() if k != "out"}
+        },
+        "results": results
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        directory = os.path.dirname(args.out)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if any("error" in r or r["errors"] for r in results.values() if isinstance(r, dict)) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
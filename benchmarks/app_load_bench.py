@@ -0,0 +1,228 @@
+"""Concurrent-session load harness for app.py built on Streamlit's AppTest.
+
+Each simulated session walks Home -> Disease Detection -> Weather -> Ask
+Expert, with weather and Gemini pointed at the local stubs. The harness
+records wall time of every script rerun, the markdown payload each rerun
+emits, session-state size after each step, and resident memory per
+session held open.
+
+AppTest patches a process-global runtime while a script runs, so sessions
+in one process are interleaved step by step, as a single server replica
+would hold them. Real concurrency comes from --processes, which splits the
+sessions across worker processes. Run from the repository root:
+
+    python -m benchmarks.app_load_bench --sessions 20 --processes 4 --out benchmarks/results/app_load.json
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import resource
+import sys
+import time
+from multiprocessing import get_context
+
+import numpy as np
+
+from benchmarks.stubs import install_fake_gemini, start_weather_stub
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def _rss_kb():
+    """Current resident set size; falls back to the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def _navigate(page):
+    return lambda at, n: at.sidebar.radio[0].set_value(page).run()
+
+
+def _journey():
+    """[(step, action(at, session_index))]; every action ends with a rerun"""
+    return [
+        ("home", lambda at, n: at.run()),
+        ("disease.open", _navigate("🔍 Disease Detection")),
+        # AppTest has no file_uploader support, so the upload itself is not exercised
+        ("disease.select_crop", lambda at, n: _widget(at.selectbox, "Select Crop Type (Optional)").set_value("Tomato").run()),
+        ("weather.open", _navigate("🌦️ Weather Recommendations")),
+        ("weather.city", lambda at, n: _widget(at.text_input, "City Name").input("Nashik").run()),
+        ("weather.state", lambda at, n: _widget(at.selectbox, "State").set_value("Maharashtra").run()),
+        ("weather.crop", lambda at, n: _widget(at.selectbox, "Select Crop").set_value("Onion").run()),
+        ("weather.submit", lambda at, n: _widget(at.button, "Get Weather Recommendations").click().run()),
+        ("expert.open", _navigate("💬 Ask Expert")),
+        ("expert.ask", lambda at, n: _widget(at.text_input, "Ask your question:").input(
+            f"How do I control aphids on mustard? (session {n})").run()),
+        ("expert.send", lambda at, n: _widget(at.button, "Send").click().run()),
+    ]
+
+
+def _state_bytes(at):
+    try:
+        return len(pickle.dumps(at.session_state.filtered_state))
+    except Exception:
+        return -1
+
+
+def _worker(job):
+    """Run a share of the sessions in this process; returns raw measurements"""
+    first_session, sessions, settings = job
+    os.environ.update(settings["env"])
+    from streamlit.testing.v1 import AppTest
+
+    # Import the service layer before the first rerun so the fake is already registered
+    install_fake_gemini(latency=settings["gemini_latency"], output_tokens=settings["output_tokens"])
+
+    baseline_kb = _rss_kb()
+    apps = [AppTest.from_file(APP_PATH, default_timeout=settings["timeout"]) for _ in range(sessions)]
+    reruns = []
+    errors = []
+    for step, action in _journey():
+        for offset, at in enumerate(apps):
+            session = first_session + offset
+            start = time.perf_counter()
+            try:
+                action(at, session)
+            except Exception as e:
+                errors.append({"session": session, "step": step, "error": f"{type(e).__name__}: {e}"})
+                continue
+            elapsed = time.perf_counter() - start
+            reruns.append({
+                "session": session,
+                "step": step,
+                "wall_ms": elapsed * 1000,
+                "markdown_chars": sum(len(m.value) for m in at.markdown),
+                "state_bytes": _state_bytes(at),
+                "exceptions": len(at.exception)
+            })
+    held_kb = _rss_kb()
+    return {
+        "pid": os.getpid(),
+        "sessions": sessions,
+        "baseline_rss_kb": baseline_kb,
+        "rss_kb": held_kb,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "reruns": reruns,
+        "errors": errors
+    }
+
+
+def _percentiles(values):
+    values = np.asarray(values, dtype=float)
+    return {
+        "p50": round(float(np.percentile(values, 50)), 2),
+        "p95": round(float(np.percentile(values, 95)), 2),
+        "p99": round(float(np.percentile(values, 99)), 2),
+        "max": round(float(values.max()), 2)
+    }
+
+
+def summarize(workers):
+    reruns = [r for w in workers for r in w["reruns"]]
+    steps = {}
+    for step, _ in _journey():
+        rows = [r for r in reruns if r["step"] == step]
+        if not rows:
+            continue
+        steps[step] = {
+            "reruns": len(rows),
+            "wall_ms": _percentiles([r["wall_ms"] for r in rows]),
+            "markdown_chars": int(np.median([r["markdown_chars"] for r in rows])),
+            "state_bytes": int(np.median([r["state_bytes"] for r in rows])),
+            "exceptions": sum(r["exceptions"] for r in rows)
+        }
+    final_state = [r["state_bytes"] for r in reruns if r["step"] == "expert.send"]
+    return {
+        "sessions": sum(w["sessions"] for w in workers),
+        "processes": len(workers),
+        "reruns": len(reruns),
+        "rerun_wall_ms": _percentiles([r["wall_ms"] for r in reruns]) if reruns else None,
+        "rss_per_session_kb": round(float(np.mean([
+            (w["rss_kb"] - w["baseline_rss_kb"]) / w["sessions"] for w in workers
+        ])), 1),
+        "peak_rss_per_process_kb": max(w["peak_rss_kb"] for w in workers),
+        "final_state_bytes": _percentiles(final_state) if final_state else None,
+        "steps": steps,
+        "errors": [e for w in workers for e in w["errors"]]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--weather-latency", type=float, default=0.02, help="simulated OpenWeather latency (s)")
+    parser.add_argument("--gemini-latency", type=float, default=0.2, help="simulated Gemini latency (s)")
+    parser.add_argument("--output-tokens", type=int, default=400)
+    parser.add_argument("--timeout", type=float, default=30, help="per-rerun AppTest timeout (s)")
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    server, base_url = start_weather_stub(latency=args.weather_latency)
+    settings = {
+        "env": {
+            "OPENWEATHER_API_KEY": "benchmark",
+            "OPENWEATHER_BASE_URL": base_url,
+            "WEATHER_RPM": "0",
+            "GEMINI_API_KEY": "benchmark",
+            "GEMINI_RPM": "0",
+            "GEMINI_TPM": "0",
+            "GEMINI_WARMUP": "0",
+            "RESPONSE_CACHE_ENABLED": "0"
+        },
+        "gemini_latency": args.gemini_latency,
+        "output_tokens": args.output_tokens,
+        "timeout": args.timeout
+    }
+
+    processes = max(1, min(args.processes, args.sessions))
+    shares = [args.sessions // processes + (i < args.sessions % processes) for i in range(processes)]
+    jobs = [(sum(shares[:i]), share, settings) for i, share in enumerate(shares)]
+
+    started = time.perf_counter()
+    try:
+        # spawn, so each worker imports config after its environment is set
+        with get_context("spawn").Pool(processes) as pool:
+            workers = pool.map(_worker, jobs)
+    finally:
+        server.shutdown()
+    wall = time.perf_counter() - started
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "wall_s": round(wall, 2),
+            "settings": {k: v for k, v in vars(args).items() if k != "out"}
+        },
+        "summary": summarize(workers)
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        directory = os.path.dirname(args.out)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if report["summary"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Ask Expert rerun time and session size as the chat history grows.
+
+One AppTest session chats through the Ask Expert page against the fake
+Gemini model. At each checkpoint (messages sent so far) it measures plain
+reruns of the page, as any keystroke would trigger, and records the markdown
+payload, the pickled session-state size and how many messages were spilled
+to the chat archive. With the windowed view and the per-session cap, rerun
+time and state size should stay flat; the run fails when the last
+checkpoint's median rerun is more than --max-growth times the first one's.
+Run from the repository root:
+
+    python -m benchmarks.chat_history_bench --checkpoints 10 100 500 1000 --out benchmarks/results/chat_history.json
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.stubs import install_fake_gemini
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def _widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def _state_bytes(at):
+    try:
+        return len(pickle.dumps(at.session_state.filtered_state))
+    except Exception:
+        return -1
+
+
+def run(args):
+    from streamlit.testing.v1 import AppTest
+
+    install_fake_gemini(latency=0, output_tokens=args.output_tokens)
+    at = AppTest.from_file(APP_PATH, default_timeout=args.timeout).run()
+    at.sidebar.radio[0].set_value("💬 Ask Expert").run()
+
+    results = []
+    sent = 0
+    for checkpoint in sorted(args.checkpoints):
+        while sent < checkpoint:
+            _widget(at.text_input, "Ask your question:").input(f"Question {sent}: when should I irrigate wheat?").run()
+            _widget(at.button, "Send").click().run()
+            sent += 1
+
+        timings = []
+        for _ in range(args.reruns):
+            start = time.perf_counter()
+            at.run()
+            timings.append((time.perf_counter() - start) * 1000)
+        state = at.session_state
+        record = {
+            "exchanges": sent,
+            "rerun_ms_p50": round(float(np.percentile(timings, 50)), 2),
+            "rerun_ms_p95": round(float(np.percentile(timings, 95)), 2),
+            "markdown_chars": sum(len(m.value) for m in at.markdown),
+            "elements": len(at.markdown),
+            "messages_in_memory": len(state["chat_history"]),
+            "messages_spilled": state["chat_spilled"],
+            "state_bytes": _state_bytes(at),
+            "exceptions": len(at.exception)
+        }
+        results.append(record)
+        print(
+            f"{sent:>6} exchanges  rerun p50={record['rerun_ms_p50']:>7.2f}ms  "
+            f"in-memory={record['messages_in_memory']:>4}  spilled={record['messages_spilled']:>6}  "
+            f"state={record['state_bytes']:>8}B",
+            file=sys.stderr
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checkpoints", type=int, nargs="+", default=[10, 100, 500, 1000],
+                        help="measure after this many exchanges")
+    parser.add_argument("--reruns", type=int, default=20, help="reruns measured per checkpoint")
+    parser.add_argument("--output-tokens", type=int, default=150)
+    parser.add_argument("--timeout", type=float, default=30, help="per-rerun AppTest timeout (s)")
+    parser.add_argument("--max-growth", type=float, default=1.5, help="allowed last/first median rerun ratio")
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    # config is read when AppTest first runs app.py, so this must be set before run()
+    scratch = tempfile.mkdtemp(prefix="chat_history_bench_")
+    os.environ.update({
+        "GEMINI_API_KEY": "benchmark",
+        "GEMINI_RPM": "0",
+        "GEMINI_TPM": "0",
+        "GEMINI_WARMUP": "0",
+        "RESPONSE_CACHE_ENABLED": "0",
+        "CHAT_ARCHIVE_PATH": os.path.join(scratch, "chat_archive.sqlite")
+    })
+
+    results = run(args)
+    growth = results[-1]["rerun_ms_p50"] / results[0]["rerun_ms_p50"] if results[0]["rerun_ms_p50"] else None
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {k: v for k, v in vars(args).items() if k != "out"}
+        },
+        "rerun_growth": round(growth, 2) if growth else None,
+        "checkpoints": results
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        directory = os.path.dirname(args.out)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    failed = any(r["exceptions"] for r in results) or (growth is not None and growth > args.max_growth)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
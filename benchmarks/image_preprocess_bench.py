@@ -0,0 +1,73 @@
+"""Measure bytes and time saved by preprocess_image on large phone photos.
+
+Run from the repository root:
+
+    python -m benchmarks.image_preprocess_bench --megapixels 12 48
+"""
+import argparse
+import io
+import json
+import time
+
+from PIL import Image
+
+from utils.gemini_service import preprocess_image
+
+
+def _synthetic_photo(megapixels):
+    """Build a JPEG roughly the size of a phone camera capture"""
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    noise = Image.effect_noise((width, height), 64).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    photo = Image.blend(noise, gradient, 0.5)
+    buffer = io.BytesIO()
+    photo.save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def _naive_upload(data):
+    """What the app used to do: decode at full size and let the SDK re-encode"""
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def _timed(fn, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(data)
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=int, nargs="+", default=[12, 48])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    report = []
+    for megapixels in args.megapixels:
+        data = _synthetic_photo(megapixels)
+        naive, naive_ms = _timed(_naive_upload, data, args.repeat)
+        prepared, prepared_ms = _timed(lambda d: preprocess_image(d)["data"], data, args.repeat)
+        report.append({
+            "megapixels": megapixels,
+            "source_bytes": len(data),
+            "naive_upload_bytes": len(naive),
+            "preprocessed_bytes": len(prepared),
+            "bytes_saved": len(naive) - len(prepared),
+            "naive_ms": round(naive_ms, 1),
+            "preprocess_ms": round(prepared_ms, 1),
+            "ms_saved": round(naive_ms - prepared_ms, 1)
+        })
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Gemini helper latency through a simulated upstream incident, checked against the deadlines.
+
+Expert chat and weather advice run against the fake Gemini model, arriving
+at a fixed --rate (open loop, as users keep arriving during an incident), through
+four phases: healthy (with a slow tail that hedging should absorb), a
+brownout where Gemini answers slower than every deadline, an outage where
+every call fails, and recovery once the breaker's cooldown has passed. Each
+phase reports latency percentiles, how many answers came from Gemini, from
+a local fallback (rule-based weather advice, cached or precomputed answers)
+or were errors, and the breaker's state at the end. Deadlines, hedge delay,
+SLO and cooldown are scaled down so a run takes well under a minute. The exit
+status is non-zero when any call outlived its deadline by more than --slack
+seconds. Run from the repository root:
+
+    python -m benchmarks.incident_bench --out benchmarks/results/incident.json
+    python -m benchmarks.incident_bench --calls 200 --rate 50 --deadline 1
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.stubs import fake_weather, install_fake_gemini
+
+
+# phase -> FakeGeminiModel settings; latencies are multiples of the deadline
+PHASES = {
+    "healthy": {"latency": 0.1, "slow_rate": 0.05, "slow_latency": 3.0, "error_rate": 0.0},
+    "brownout": {"latency": 2.0, "slow_rate": 0.0, "slow_latency": 0.0, "error_rate": 0.0},
+    "outage": {"latency": 0.05, "slow_rate": 0.0, "slow_latency": 0.0, "error_rate": 1.0},
+    "recovery": {"latency": 0.1, "slow_rate": 0.0, "slow_latency": 0.0, "error_rate": 0.0},
+}
+
+
+def _classify(text):
+    if text.startswith(("Error", "Please set")):
+        return "error"
+    # The fake model answers with repeated "advice"; anything else came from a local fallback
+    return "gemini" if text.startswith("advice") else "fallback"
+
+
+def _run_phase(models, settings, calls, rate, salt):
+    from utils.gemini_service import chat_with_ai
+    from utils.weather_service import get_weather_recommendations
+
+    for model in models.values():
+        for name, value in settings.items():
+            setattr(model, name, value)
+
+    def work(i):
+        time.sleep(max(0.0, begin + i / rate - time.perf_counter()))
+        start = time.perf_counter()
+        if i % 2:
+            helper = "chat_with_ai"
+            text = chat_with_ai(f"How do I control aphids on mustard? ({salt}-{i})")
+        else:
+            helper = "get_weather_recommendations"
+            # A distinct temperature per call keeps the weather-band cache cold
+            weather = fake_weather()
+            weather["main"]["temp"] = 10 + (i * 7) % 30
+            weather["main"]["humidity"] = 20 + (i * 13) % 80
+            text = get_weather_recommendations(f"Crop-{salt}-{i}", weather)
+        return helper, time.perf_counter() - start, _classify(text)
+
+    # One thread per call, so a slow answer never delays the next arrival
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=calls) as executor:
+        return list(executor.map(work, range(calls)))
+
+
+def _summarize(records):
+    ms = np.array([seconds for _, seconds, _ in records]) * 1000
+    outcomes = {}
+    for _, _, outcome in records:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    return {
+        "calls": len(records),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "max_ms": round(float(ms.max()), 1),
+        "outcomes": outcomes
+    }
+
+
+def run(args):
+    from utils import gemini_service
+    from utils.weather_service import get_generic_weather_recommendations
+
+    models = install_fake_gemini(output_tokens=50)
+    # Load the rule-based fallback up front; its first use imports the crop rules
+    get_generic_weather_recommendations(fake_weather(), "Wheat")
+    results = {}
+    for phase, settings in PHASES.items():
+        if phase == "recovery":
+            # Let the breaker reach half-open so a probe can close it again
+            time.sleep(args.deadline * 2)
+        scaled = {name: value * args.deadline if "latency" in name else value for name, value in settings.items()}
+        records = _run_phase(models, scaled, args.calls, args.rate, uuid.uuid4().hex[:8])
+        result = _summarize(records)
+        result["by_helper"] = {
+            helper: _summarize([r for r in records if r[0] == helper]) for helper in sorted({r[0] for r in records})
+        }
+        result["breaker"] = gemini_service.get_gemini_quota_stats()["breaker"]
+        results[phase] = result
+        print(
+            f"{phase:9} p50={result['p50_ms']:>7.1f}ms p99={result['p99_ms']:>7.1f}ms max={result['max_ms']:>7.1f}ms "
+            f"{result['outcomes']} breaker={result['breaker']['state']}",
+            file=sys.stderr
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=240, help="calls per phase, half chat and half weather")
+    parser.add_argument("--rate", type=float, default=40, help="call arrivals per second")
+    parser.add_argument("--deadline", type=float, default=1.5, help="Gemini deadline for both helpers (s)")
+    parser.add_argument("--slack", type=float, default=0.25, help="allowed overrun of the deadline (s)")
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    # config is read when the services are first imported, so this must come first
+    os.environ.update({
+        "GEMINI_API_KEY": "benchmark",
+        "GEMINI_RPM": "0",
+        "GEMINI_TPM": "0",
+        "RESPONSE_CACHE_PATH": os.path.join(tempfile.mkdtemp(prefix="incident_bench_"), "responses.sqlite"),
+        "GEMINI_TIMEOUT_CHAT": str(args.deadline),
+        "GEMINI_TIMEOUT_WEATHER": str(args.deadline),
+        "GEMINI_HEDGE_DELAY": str(args.deadline / 3),
+        "GEMINI_LATENCY_SLO": str(args.deadline * 0.8),
+        "GEMINI_BREAKER_COOLDOWN": str(args.deadline * 2),
+        "GEMINI_CALL_THREADS": str(args.calls * 2)
+    })
+
+    results = run(args)
+    worst_ms = max(result["max_ms"] for result in results.values())
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {k: v for k, v in vars(args).items() if k != "out"}
+        },
+        "worst_ms": worst_ms,
+        "phases": results
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        directory = os.path.dirname(args.out)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if worst_ms > (args.deadline + args.slack) * 1000 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Measure lookup cost and write amplification of the on-disk response cache.
+
+Run from the repository root:
+
+    python -m benchmarks.response_cache_bench --entries 5000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from utils.response_cache import ResponseCache, make_key
+
+
+def _bytes_written():
+    """Bytes this process has passed to write() so far (Linux only)"""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _micros(samples):
+    ordered = sorted(samples)
+    return {
+        "p50_us": round(statistics.median(ordered) * 1e6, 1),
+        "p99_us": round(ordered[int(0.99 * (len(ordered) - 1))] * 1e6, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--body-bytes", type=int, default=3000, help="typical Gemini answer size")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    keys = [make_key("models/gemini-2.5-flash", f"question {i}", version="1") for i in range(args.entries)]
+    body = "x" * args.body_bytes
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(os.path.join(directory, "cache.sqlite"))
+
+        written_before = _bytes_written()
+        set_samples = []
+        for key in keys:
+            start = time.perf_counter()
+            cache.set(key, body)
+            set_samples.append(time.perf_counter() - start)
+        written_after = _bytes_written()
+
+        hit_samples = []
+        for key in rng.sample(keys, min(len(keys), 2000)):
+            start = time.perf_counter()
+            cache.get(key)
+            hit_samples.append(time.perf_counter() - start)
+
+        miss_samples = []
+        for i in range(2000):
+            start = time.perf_counter()
+            cache.get(make_key("models/gemini-2.5-flash", f"unseen {i}"))
+            miss_samples.append(time.perf_counter() - start)
+
+        payload = args.entries * args.body_bytes
+        report = {
+            "entries": args.entries,
+            "set": _micros(set_samples),
+            "get_hit": _micros(hit_samples),
+            "get_miss": _micros(miss_samples),
+            "payload_bytes": payload,
+            "bytes_written": None if written_before is None else written_after - written_before,
+            "write_amplification": None if written_before is None
+            else round((written_after - written_before) / payload, 2)
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""Latency, throughput and memory of the service-layer helpers against local stubs.
+
+Every public helper in utils/weather_service.py and utils/gemini_service.py
+runs against a fake OpenWeather server and a fake Gemini model, at each
+concurrency level, with cold caches (every call unique) and warm caches
+(every call identical), and for disease detection at several image sizes.
+peak_alloc_kb is the tracemalloc peak over a short sequential pass, so it
+covers Python allocations but not native buffers such as Pillow's pixel
+data; the report's meta also records the process max RSS. No API keys or
+network are needed. Run from the repository root:
+
+    python -m benchmarks.service_bench --out benchmarks/results/baseline.json
+    python -m benchmarks.service_bench --concurrency 1 16 --gemini-latency 0.5 --rate-limit-rate 0.05
+    python -m benchmarks.service_bench --compare benchmarks/results/baseline.json benchmarks/results/new.json
+"""
+import argparse
+import asyncio
+import functools
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.stubs import install_fake_gemini, start_weather_stub
+
+
+IMAGE_SIZES = {"small": 0.3, "medium": 3, "large": 12}
+MEMORY_CALLS = 20
+
+
+@functools.lru_cache(maxsize=64)
+def _photo(megapixels, seed):
+    """A distinct JPEG per seed; coarse noise upscaled so perceptual hashes differ"""
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    rng = np.random.default_rng(seed)
+    coarse = Image.fromarray(rng.integers(0, 256, (12, 16, 3), dtype=np.uint8))
+    photo = Image.blend(coarse.resize((width, height), Image.BILINEAR),
+                        Image.effect_noise((width, height), 32).convert("RGB"), 0.3)
+    buffer = io.BytesIO()
+    photo.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _is_error(result):
+    if isinstance(result, tuple):
+        return result[1] is not None
+    if isinstance(result, str):
+        return result.startswith(("Error", "Please set", "GEMINI_API_KEY missing"))
+    return False
+
+
+def _scenarios(salt):
+    """[(helper, image_label, kind, make_call)]; make_call(i, warm) returns a zero-arg callable"""
+    from config import ALL_CROPS
+    from utils import gemini_service as gemini
+    from utils import weather_service as weather
+    from benchmarks.stubs import fake_weather
+
+    def city(i, warm):
+        return "Warm Village" if warm else f"Village {salt}-{i}"
+
+    def weather_payload(i, warm):
+        data = fake_weather()
+        if not warm:
+            # Cycle through crops and temperature bands so cached advice is never reused
+            data["main"]["temp"] = -30 + 3 * (i // len(ALL_CROPS))
+        return data
+
+    def crop(i, warm):
+        return "Rice" if warm else ALL_CROPS[i % len(ALL_CROPS)]
+
+    scenarios = [
+        ("weather.get_weather_data", None, "sync",
+         lambda i, warm: lambda: weather.get_weather_data(city(i, warm), "Maharashtra")),
+        ("weather.get_forecast", None, "sync",
+         lambda i, warm: lambda: weather.get_forecast(city(i, warm), "Maharashtra")),
+        ("weather.get_weather_bulk[100]", None, "sync",
+         lambda i, warm: lambda: weather.get_weather_bulk(
+             [(city(i * 100 + j, warm), "Maharashtra") for j in range(100)])),
+        ("weather.get_weather_data_async", None, "async",
+         lambda i, warm: lambda: weather.get_weather_data_async(city(i, warm), "Maharashtra")),
+        ("weather.get_generic_weather_recommendations", None, "sync",
+         lambda i, warm: lambda: weather.get_generic_weather_recommendations(weather_payload(i, warm), crop(i, warm))),
+        ("gemini.get_crop_specific_weather_recommendations", None, "sync",
+         lambda i, warm: lambda: gemini.get_crop_specific_weather_recommendations(crop(i, warm), weather_payload(i, warm))),
+        ("gemini.get_crop_recommendations", None, "sync",
+         lambda i, warm: lambda: gemini.get_crop_recommendations(city(i, warm), "Loamy")),
+        ("gemini.chat_with_ai", None, "sync",
+         lambda i, warm: lambda: gemini.chat_with_ai(f"How do I store onions? {city(i, warm)}")),
+        ("gemini.chat_with_ai_stream", None, "sync",
+         lambda i, warm: lambda: "".join(gemini.chat_with_ai_stream(f"When to sow wheat? {city(i, warm)}"))),
+        ("gemini.chat_with_ai_async", None, "async",
+         lambda i, warm: lambda: gemini.chat_with_ai_async(f"Is it too hot to spray? {city(i, warm)}")),
+    ]
+
+    def image_call(analyze, megapixels, seed, *args):
+        # Photos are built when the call list is prepared, outside the timed region
+        data = _photo(megapixels, seed)
+        return lambda: analyze(data, *args)
+
+    for label, megapixels in IMAGE_SIZES.items():
+        scenarios.append((
+            "gemini.analyze_crop_disease", label, "sync",
+            lambda i, warm, megapixels=megapixels: image_call(
+                gemini.analyze_crop_disease, megapixels, 0 if warm else i, "Tomato")
+        ))
+    scenarios.append((
+        "gemini.analyze_soil_quality", "medium", "sync",
+        lambda i, warm: image_call(
+            gemini.analyze_soil_quality, IMAGE_SIZES["medium"], 10_000 + (0 if warm else i), "red, cracks when dry")
+    ))
+    return scenarios
+
+
+def _run_sync(calls, concurrency):
+    latencies = [0.0] * len(calls)
+    errors = [False] * len(calls)
+
+    def work(index):
+        start = time.perf_counter()
+        try:
+            errors[index] = _is_error(calls[index]())
+        except Exception:
+            errors[index] = True
+        latencies[index] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(work, range(len(calls))))
+    return latencies, errors, time.perf_counter() - start
+
+
+def _run_async(calls, concurrency):
+    latencies = [0.0] * len(calls)
+    errors = [False] * len(calls)
+
+    async def main():
+        gate = asyncio.Semaphore(concurrency)
+
+        async def work(index):
+            async with gate:
+                start = time.perf_counter()
+                try:
+                    errors[index] = _is_error(await calls[index]())
+                except Exception:
+                    errors[index] = True
+                latencies[index] = time.perf_counter() - start
+
+        from utils.weather_service import close_async_http_session
+        try:
+            await asyncio.gather(*(work(i) for i in range(len(calls))))
+        finally:
+            await close_async_http_session()
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return latencies, errors, time.perf_counter() - start
+
+
+def _peak_memory(calls, kind):
+    """Peak traced allocation in KiB while running calls sequentially"""
+    tracemalloc.start()
+    try:
+        _runner(kind)(calls, 1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def _upstream_calls(server, models):
+    return server.requests + sum(model.calls for model in models.values())
+
+
+def _reset_caches():
+    from utils.gemini_service import clear_gemini_caches
+    from utils.weather_service import clear_weather_cache
+
+    clear_weather_cache()
+    clear_gemini_caches()
+
+
+def _runner(kind):
+    return _run_async if kind == "async" else _run_sync
+
+
+def run(args):
+    server, base_url = args.stub
+    models = install_fake_gemini(
+        latency=args.gemini_latency, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        output_tokens=args.output_tokens
+    )
+    salt = uuid.uuid4().hex[:8]
+    results = []
+    for helper, image, kind, make_call in _scenarios(salt):
+        if args.only and not any(name in helper for name in args.only):
+            continue
+        calls_per_case = args.image_calls if image else args.calls
+        for concurrency in args.concurrency:
+            for cache in ("cold", "warm"):
+                warm = cache == "warm"
+                calls = [make_call(i, warm) for i in range(calls_per_case)]
+                _reset_caches()
+                if warm:
+                    _runner(kind)(calls[:1], 1)
+                before = _upstream_calls(server, models)
+                latencies, errors, wall = _runner(kind)(calls, concurrency)
+                upstream = _upstream_calls(server, models) - before
+
+                if not warm:
+                    _reset_caches()
+                peak_kb = _peak_memory(calls[:MEMORY_CALLS], kind)
+
+                ms = np.array(latencies) * 1000
+                record = {
+                    "helper": helper,
+                    "image": image,
+                    "cache": cache,
+                    "concurrency": concurrency,
+                    "calls": len(calls),
+                    "errors": int(sum(errors)),
+                    "upstream_calls": upstream,
+                    "p50_ms": round(float(np.percentile(ms, 50)), 2),
+                    "p95_ms": round(float(np.percentile(ms, 95)), 2),
+                    "p99_ms": round(float(np.percentile(ms, 99)), 2),
+                    "mean_ms": round(float(ms.mean()), 2),
+                    "throughput_rps": round(len(calls) / wall, 1),
+                    "peak_alloc_kb": peak_kb
+                }
+                results.append(record)
+                print(
+                    f"{helper:52} {image or '':6} {cache:4} c={concurrency:<3} "
+                    f"p50={record['p50_ms']:>8.2f}ms p95={record['p95_ms']:>8.2f}ms p99={record['p99_ms']:>8.2f}ms "
+                    f"{record['throughput_rps']:>8.1f}/s mem={peak_kb:>9.1f}KiB err={record['errors']} up={upstream}",
+                    file=sys.stderr
+                )
+    return results
+
+
+def _case_key(record):
+    return (record["helper"], record["image"], record["cache"], record["concurrency"])
+
+
+def compare(base_path, new_path, threshold):
+    """Print per-case changes; returns the number of cases slower or less throughput than threshold allows"""
+    with open(base_path, encoding="utf-8") as f:
+        base = {_case_key(r): r for r in json.load(f)["results"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = {_case_key(r): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    for key in sorted(set(base) & set(new), key=str):
+        old, cur = base[key], new[key]
+        p95 = cur["p95_ms"] / old["p95_ms"] - 1 if old["p95_ms"] else 0.0
+        rps = cur["throughput_rps"] / old["throughput_rps"] - 1 if old["throughput_rps"] else 0.0
+        regressed = p95 > threshold or rps < -threshold
+        regressions += regressed
+        helper, image, cache, concurrency = key
+        print(
+            f"{'REGRESSION' if regressed else 'ok':10} {helper:52} {image or '':6} {cache:4} c={concurrency:<3} "
+            f"p95 {old['p95_ms']:.2f} -> {cur['p95_ms']:.2f}ms ({p95:+.0%})  "
+            f"throughput {old['throughput_rps']:.1f} -> {cur['throughput_rps']:.1f}/s ({rps:+.0%})"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100, help="calls per case")
+    parser.add_argument("--image-calls", type=int, default=12, help="calls per image case")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--weather-latency", type=float, default=0.02, help="simulated OpenWeather latency (s)")
+    parser.add_argument("--gemini-latency", type=float, default=0.2, help="simulated Gemini latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream calls failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of upstream calls failing with 429")
+    parser.add_argument("--output-tokens", type=int, default=400)
+    parser.add_argument("--only", nargs="+", help="run helpers whose name contains any of these")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files and exit")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression for --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        return 1 if compare(*args.compare, args.threshold) else 0
+
+    server, base_url = start_weather_stub(
+        latency=args.weather_latency, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate
+    )
+    cache_dir = tempfile.TemporaryDirectory()
+    # config is read at import time, so point it at the stubs first
+    os.environ.update({
+        "OPENWEATHER_API_KEY": "benchmark",
+        "OPENWEATHER_BASE_URL": base_url,
+        "WEATHER_RPM": "0",
+        "GEMINI_API_KEY": "benchmark",
+        "GEMINI_RPM": "0",
+        "GEMINI_TPM": "0",
+        "GEMINI_WARMUP": "0",
+        "RESPONSE_CACHE_PATH": os.path.join(cache_dir.name, "responses.sqlite")
+    })
+    args.stub = (server, base_url)
+    try:
+        results = run(args)
+    finally:
+        server.shutdown()
+        cache_dir.cleanup()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "settings": {k: v for k, v in vars(args).items() if k not in ("stub", "out", "compare")}
+        },
+        "results": results
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        directory = os.path.dirname(args.out)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
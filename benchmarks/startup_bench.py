@@ -0,0 +1,179 @@
+"""Cold-start import time and idle memory of the entry points, checked against a budget.
+
+Each target is imported in a fresh interpreter under -X importtime, --repeat
+times, and the median run is reported: import time, resident memory once
+imported, the packages that cost the most, and any heavy package that was
+loaded eagerly although it should only load on first use. app.py is run
+the way `streamlit run` would execute it for the home page (Streamlit's bare
+mode), with Streamlit's own import cost measured separately and subtracted.
+The exit status is non-zero when a target is over budget or loads a heavy
+package eagerly. Run from the repository root:
+
+    python -m benchmarks.startup_bench
+    python -m benchmarks.startup_bench --targets utils.weather_service api_server --budget-ms 150
+    python -m benchmarks.startup_bench --out benchmarks/results/startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages that must only load on first use; a target may allow ones it needs up front
+HEAVY = ("google.generativeai", "grpc", "PIL", "pandas", "numpy", "aiohttp", "requests", "matplotlib", "seaborn")
+
+# target -> (baseline whose cost is not charged to the target, heavy packages it may load, import budget ms)
+TARGETS = {
+    "app.py": ("streamlit", (), 150),
+    "api_server": (None, ("aiohttp",), 400),
+    "utils.gemini_service": (None, (), 200),
+    "utils.weather_service": (None, (), 200),
+}
+
+_CHILD = """
+import importlib, json, os, runpy, sys, time
+target = sys.argv[1]
+start = time.perf_counter()
+if target.endswith(".py"):
+    runpy.run_path(target, run_name="__main__")
+else:
+    importlib.import_module(target)
+seconds = time.perf_counter() - start
+with open("/proc/self/statm") as f:
+    rss_kb = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+print(json.dumps({"seconds": seconds, "rss_kb": rss_kb, "modules": sorted(sys.modules)}))
+"""
+
+
+def _parse_importtime(stderr):
+    """{top-level package: self microseconds} from -X importtime output"""
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return packages
+
+
+def _measure(target):
+    env = dict(os.environ, GEMINI_WARMUP="0", METRICS_PORT="0", PYTHONDONTWRITEBYTECODE="1")
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, target],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_s"] = wall
+    result["packages"] = _parse_importtime(proc.stderr)
+    return result
+
+
+def _median_run(target, repeat):
+    runs = sorted((_measure(target) for _ in range(repeat)), key=lambda r: r["seconds"])
+    return runs[len(runs) // 2]
+
+
+def _loaded(modules, package):
+    return package in modules or any(m.startswith(package + ".") for m in modules)
+
+
+def profile(target, repeat, top):
+    baseline_name, allowed, _ = TARGETS.get(target, (None, (), None))
+    run = _median_run(target, repeat)
+    modules = set(run["modules"])
+    baseline = _median_run(baseline_name, repeat) if baseline_name else None
+    baseline_modules = set(baseline["modules"]) if baseline else set()
+
+    packages = dict(run["packages"])
+    for package, self_us in (baseline["packages"] if baseline else {}).items():
+        packages[package] = max(0, packages.get(package, 0) - self_us)
+    costly = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    eager = [
+        package for package in HEAVY
+        if package not in allowed and _loaded(modules, package) and not _loaded(baseline_modules, package)
+    ]
+    return {
+        "import_ms": round((run["seconds"] - (baseline["seconds"] if baseline else 0)) * 1000, 1),
+        "rss_mb": round((run["rss_kb"] - (baseline["rss_kb"] if baseline else 0)) / 1024, 1),
+        "process_ms": round(run["process_s"] * 1000, 1),
+        "baseline": baseline_name,
+        "baseline_import_ms": round(baseline["seconds"] * 1000, 1) if baseline else None,
+        "modules": len(modules - baseline_modules),
+        "eager_heavy": eager,
+        "top_packages_ms": {package: round(us / 1000, 1) for package, us in costly}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per target; the median is reported")
+    parser.add_argument("--top", type=int, default=8, help="costliest packages to list")
+    parser.add_argument("--budget-ms", type=float, help="allowed import time for every target (default: per target)")
+    parser.add_argument("--budget-rss-mb", type=float, default=60, help="allowed resident memory per target")
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    results = {}
+    failed = False
+    for target in args.targets:
+        try:
+            result = profile(target, args.repeat, args.top)
+        except Exception as e:
+            results[target] = {"error": f"{type(e).__name__}: {e}"}
+            print(f"{target:24} failed: {e}", file=sys.stderr)
+            failed = True
+            continue
+        over = []
+        budget_ms = args.budget_ms or TARGETS.get(target, (None, (), 250))[2]
+        if result["import_ms"] > budget_ms:
+            over.append(f"import {result['import_ms']}ms > {budget_ms}ms")
+        if result["rss_mb"] > args.budget_rss_mb:
+            over.append(f"rss {result['rss_mb']}MB > {args.budget_rss_mb}MB")
+        if result["eager_heavy"]:
+            over.append("eager: " + ", ".join(result["eager_heavy"]))
+        result["over_budget"] = over
+        failed = failed or bool(over)
+        results[target] = result
+        print(
+            f"{target:24} {result['import_ms']:>8.1f}ms {result['rss_mb']:>7.1f}MB "
+            f"{'OVER: ' + '; '.join(over) if over else 'ok'}",
+            file=sys.stderr
+        )
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {k: v for k, v in vars(args).items() if k != "out"}
+        },
+        "results": results
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        directory = os.path.dirname(args.out)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
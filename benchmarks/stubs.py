@@ -0,0 +1,211 @@
+"""Local stand-ins for upstream APIs used by the benchmarks."""
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_weather(city="Nashik", lat=20.0, lon=73.8):
+    return {
+        "name": city,
+        "coord": {"lat": lat, "lon": lon},
+        "main": {"temp": 30.0, "feels_like": 32.0, "temp_min": 28.0, "temp_max": 33.0,
+                 "humidity": 60, "pressure": 1008},
+        "weather": [{"main": "Clouds", "description": "scattered clouds"}],
+        "wind": {"speed": 2.5}
+    }
+
+
+def fake_forecast(city="Nashik", lat=20.0, lon=73.8, start=None):
+    """A 5-day / 3-hour forecast payload with 40 steps"""
+    start = int(start if start is not None else time.time())
+    steps = []
+    for i in range(40):
+        steps.append({
+            "dt": start + i * 10800,
+            "main": {"temp": 26.0 + 6 * ((i % 8) / 7), "humidity": 55 + (i % 5) * 5},
+            "wind": {"speed": 2.0 + (i % 4)},
+            "rain": {"3h": 1.2} if i % 9 == 0 else {},
+            "pop": 0.4 if i % 9 == 0 else 0.05
+        })
+    return {"city": {"name": city, "coord": {"lat": lat, "lon": lon}}, "list": steps}
+
+
+class _WeatherHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _send(self, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            server.requests += 1
+            roll = server.random.random()
+        if roll < server.rate_limit_rate:
+            self._send(429, {"cod": 429, "message": "rate limited"}, [("Retry-After", "0")])
+            return
+        if roll < server.rate_limit_rate + server.error_rate:
+            self._send(500, {"cod": 500, "message": "internal error"})
+            return
+        
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        city = query.get("q", ["Nashik"])[0].split(",")[0]
+        lat = float(query.get("lat", [20.0])[0])
+        lon = float(query.get("lon", [73.8])[0])
+        if url.path.endswith("/forecast"):
+            self._send(200, fake_forecast(city, lat, lon))
+        else:
+            self._send(200, fake_weather(city, lat, lon))
+
+    def log_message(self, *args):
+        pass
+
+
+def start_weather_stub(latency=0.0, error_rate=0.0, rate_limit_rate=0.0, seed=0):
+    """Start a fake OpenWeather server in a daemon thread; returns (server, base_url).
+
+    error_rate and rate_limit_rate are the fractions of requests answered with
+    500 and 429 (Retry-After: 0); server.requests counts what actually arrived.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _WeatherHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_rate = error_rate
+    server.rate_limit_rate = rate_limit_rate
+    server.random = random.Random(seed)
+    server.lock = threading.Lock()
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class _Usage:
+    def __init__(self, prompt_tokens, output_tokens):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.total_token_count = prompt_tokens + output_tokens
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeResponse:
+    """Quacks like a GenerateContentResponse: .text, .usage_metadata, iterable when streamed"""
+
+    def __init__(self, text, usage, chunks=None, chunk_delay=0.0):
+        self.text = text
+        self.usage_metadata = usage
+        self._chunks = chunks or [text]
+        self._chunk_delay = chunk_delay
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if self._chunk_delay:
+                time.sleep(self._chunk_delay)
+            yield _Chunk(chunk)
+
+
+class FakeGeminiModel:
+    """In-process stand-in for genai.GenerativeModel.
+
+    Each call sleeps for latency seconds (the time to first chunk when
+    streaming, with chunk_delay between later chunks), or for slow_latency
+    in a slow_rate fraction of calls, then fails with a 429
+    ResourceExhausted or a 500 InternalServerError at the configured rates,
+    otherwise answers with output_tokens worth of text.
+    """
+
+    def __init__(self, model_name, latency=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 output_tokens=400, stream_chunks=8, chunk_delay=0.0, slow_rate=0.0, slow_latency=0.0, seed=0):
+        self.model_name = model_name
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.output_tokens = output_tokens
+        self.stream_chunks = stream_chunks
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _outcome(self, contents):
+        from google.api_core import exceptions
+
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            raise exceptions.ResourceExhausted("429 Resource has been exhausted (e.g. check quota).")
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise exceptions.InternalServerError("500 An internal error has occurred.")
+        
+        parts = [contents] if isinstance(contents, str) else contents
+        prompt_tokens = sum(len(part) // 4 if isinstance(part, str) else 258 for part in parts)
+        text = " ".join(["advice"] * self.output_tokens)
+        return text, _Usage(prompt_tokens, self.output_tokens)
+
+    def _delay(self):
+        if self.slow_rate:
+            with self._lock:
+                slow = self._random.random() < self.slow_rate
+            if slow:
+                return self.slow_latency
+        return self.latency
+
+    def _respond(self, text, usage, stream):
+        if not stream:
+            return FakeResponse(text, usage)
+        step = max(1, len(text) // self.stream_chunks)
+        chunks = [text[i:i + step] for i in range(0, len(text), step)]
+        return FakeResponse(text, usage, chunks, chunk_delay=self.chunk_delay)
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        return self._respond(*self._outcome(contents), stream)
+
+    async def generate_content_async(self, contents, stream=False, **kwargs):
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(*self._outcome(contents), stream)
+
+    def count_tokens(self, contents):
+        return None
+
+
+def install_fake_gemini(**options):
+    """Register FakeGeminiModel for the configured model names; returns the models.
+
+    gemini_service only reaches models through its registry, so every helper
+    (sync, async, streaming, batch) talks to the fake afterwards.
+    """
+    from config import GEMINI_MODEL, GEMINI_VISION_MODEL
+    from utils import gemini_service
+
+    models = {}
+    for model_name in {GEMINI_MODEL, GEMINI_VISION_MODEL}:
+        models[model_name] = FakeGeminiModel(model_name, **options)
+    with gemini_service._models_lock:
+        gemini_service._models.update(models)
+    return models
@@ -0,0 +1,69 @@
+"""Compare get_weather_bulk against a one-at-a-time get_weather_data loop.
+
+Runs against a local stub with simulated network latency, so no API key is
+needed. Run from the repository root:
+
+    python -m benchmarks.weather_bulk_bench --locations 1000 --latency 0.02
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks.stubs import start_weather_stub
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--locations", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated upstream latency in seconds")
+    parser.add_argument("--workers", type=int, default=20)
+    args = parser.parse_args()
+
+    server, base_url = start_weather_stub(latency=args.latency)
+    # config is read at import time, so point it at the stub first
+    os.environ.update({
+        "OPENWEATHER_API_KEY": "benchmark",
+        "OPENWEATHER_BASE_URL": base_url,
+        "WEATHER_RPM": "0",
+        "WEATHER_POOL_SIZE": str(args.workers)
+    })
+    from utils.weather_service import clear_weather_cache, get_weather_bulk, get_weather_data
+
+    # 10% duplicates, as when several farms share a village
+    unique = max(1, int(args.locations * 0.9))
+    locations = [(f"Village {i % unique}", "Maharashtra") for i in range(args.locations)]
+
+    try:
+        clear_weather_cache()
+        start = time.perf_counter()
+        for city, state in locations:
+            get_weather_data(city, state)
+        loop_s = time.perf_counter() - start
+
+        clear_weather_cache()
+        start = time.perf_counter()
+        frame = get_weather_bulk(locations, max_workers=args.workers)
+        bulk_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        get_weather_bulk(locations, max_workers=args.workers)
+        warm_s = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    print(json.dumps({
+        "locations": args.locations,
+        "unique_locations": unique,
+        "latency_s": args.latency,
+        "loop_s": round(loop_s, 3),
+        "bulk_cold_s": round(bulk_s, 3),
+        "bulk_warm_cache_s": round(warm_s, 3),
+        "speedup": round(loop_s / bulk_s, 1),
+        "rows": len(frame),
+        "errors": int(frame["error"].notna().sum())
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
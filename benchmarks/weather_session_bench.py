@@ -0,0 +1,58 @@
+"""Compare one-off requests.get against the pooled weather session.
+
+Run from the repository root:
+
+    python -m benchmarks.weather_session_bench --requests 500
+"""
+import argparse
+import json
+import statistics
+import time
+
+import requests
+
+from benchmarks.stubs import start_weather_stub
+from utils.weather_service import get_http_session
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _measure(fetch, url, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fetch(url, params={"q": "Nashik, Maharashtra, India"}, timeout=(3.05, 10)).content
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "p99_ms": round(_percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    server, base_url = start_weather_stub()
+    url = f"{base_url}/data/2.5/weather"
+
+    try:
+        results = {
+            "requests.get": _measure(requests.get, url, args.requests),
+            "pooled_session": _measure(get_http_session().get, url, args.requests)
+        }
+    finally:
+        server.shutdown()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Build the offline gazetteer CSV from a GeoNames country dump.
+
+The bundled data/india_places.csv covers district towns only. For village-level
+autocomplete, download IN.zip and admin1CodesASCII.txt from
+https://download.geonames.org/export/dump/ and run:
+
+    python build_gazetteer.py IN.txt admin1CodesASCII.txt --min-population 0
+"""
+import argparse
+import csv
+import sys
+
+from config import GAZETTEER_PATH, INDIAN_STATES
+
+
+def load_states(admin1_path):
+    """GeoNames admin1 code (e.g. '16') -> state name, limited to INDIAN_STATES"""
+    wanted = {state.lower(): state for state in INDIAN_STATES}
+    states = {}
+    with open(admin1_path, encoding="utf-8") as f:
+        for line in f:
+            code, name, ascii_name, _ = line.rstrip("\n").split("\t", 3)
+            country, _, admin1 = code.partition(".")
+            state = wanted.get(ascii_name.lower()) or wanted.get(name.lower())
+            if country == "IN" and state:
+                states[admin1] = state
+    return states
+
+def iter_places(dump_path, states, min_population):
+    """Populated places (feature class P) from a GeoNames dump"""
+    with open(dump_path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 15 or fields[6] != "P":
+                continue
+            state = states.get(fields[10])
+            if not state or int(fields[14] or 0) < min_population:
+                continue
+            name, ascii_name = fields[1], fields[2]
+            aliases = [ascii_name] if ascii_name and ascii_name != name else []
+            yield name, state, round(float(fields[4]), 4), round(float(fields[5]), 4), "|".join(aliases)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dump", help="GeoNames IN.txt")
+    parser.add_argument("admin1", help="GeoNames admin1CodesASCII.txt")
+    parser.add_argument("--out", default=GAZETTEER_PATH, help="output CSV path")
+    parser.add_argument("--min-population", type=int, default=0, help="skip smaller places")
+    args = parser.parse_args()
+    
+    states = load_states(args.admin1)
+    count = 0
+    with open(args.out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "state", "lat", "lon", "aliases"])
+        for row in iter_places(args.dump, states, args.min_population):
+            writer.writerow(row)
+            count += 1
+    
+    print(f"Wrote {count} places for {len(states)} states to {args.out}")
+    return 0 if count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,3 +26,110 @@ INDIAN_STATES = [
     "Jharkhand", "Chhattisgarh", "Himachal Pradesh", "Uttarakhand"
 ]
 
+
+# Weather lookup cache (seconds / entries)
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "600"))
+WEATHER_NEGATIVE_CACHE_TTL = int(os.getenv("WEATHER_NEGATIVE_CACHE_TTL", "3600"))
+WEATHER_CACHE_MAXSIZE = int(os.getenv("WEATHER_CACHE_MAXSIZE", "1024"))
+
+# OpenWeather HTTP client
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org")
+WEATHER_POOL_SIZE = int(os.getenv("WEATHER_POOL_SIZE", "20"))
+WEATHER_CONNECT_TIMEOUT = float(os.getenv("WEATHER_CONNECT_TIMEOUT", "3.05"))
+WEATHER_READ_TIMEOUT = float(os.getenv("WEATHER_READ_TIMEOUT", "10"))
+WEATHER_MAX_RETRIES = int(os.getenv("WEATHER_MAX_RETRIES", "3"))
+WEATHER_BACKOFF_BASE = float(os.getenv("WEATHER_BACKOFF_BASE", "0.5"))
+WEATHER_BACKOFF_MAX = float(os.getenv("WEATHER_BACKOFF_MAX", "8"))
+
+# Gemini models
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_VISION_MODEL = os.getenv("GEMINI_VISION_MODEL", GEMINI_MODEL)
+GEMINI_WARMUP = os.getenv("GEMINI_WARMUP", "1") == "1"
+GEMINI_WARMUP_PING = os.getenv("GEMINI_WARMUP_PING", "0") == "1"
+
+# Image preprocessing before vision calls
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "1536"))
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "85"))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", "64000000"))
+
+# Perceptual-hash cache for image analysis results
+IMAGE_CACHE_MAXSIZE = int(os.getenv("IMAGE_CACHE_MAXSIZE", "10000"))
+IMAGE_HASH_THRESHOLD = int(os.getenv("IMAGE_HASH_THRESHOLD", "6"))
+
+# Cache of crop-specific weather advice per (crop, weather bands)
+WEATHER_ADVICE_CACHE_TTL = int(os.getenv("WEATHER_ADVICE_CACHE_TTL", "10800"))
+WEATHER_ADVICE_CACHE_MAXSIZE = int(os.getenv("WEATHER_ADVICE_CACHE_MAXSIZE", "20000"))
+
+# Soil types offered on the Crop Diversification page
+SOIL_TYPES = ["Loamy", "Clayey", "Sandy", "Red Soil", "Black Soil", "Alluvial", "Other"]
+
+# Precomputed crop diversification recommendations
+RECOMMENDATION_STORE_PATH = os.getenv("RECOMMENDATION_STORE_PATH", "data/crop_recommendations.sqlite")
+
+# Persistent Gemini response cache shared by all worker processes
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "data/response_cache.sqlite")
+RESPONSE_CACHE_MAX_MB = int(os.getenv("RESPONSE_CACHE_MAX_MB", "256"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Gemini request rate (0 disables limiting) and batch analysis concurrency
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "300"))
+GEMINI_BATCH_CONCURRENCY = int(os.getenv("GEMINI_BATCH_CONCURRENCY", "8"))
+
+# Upstream quotas enforced by queueing token buckets (0 disables)
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "1000000"))
+GEMINI_EXPECTED_OUTPUT_TOKENS = int(os.getenv("GEMINI_EXPECTED_OUTPUT_TOKENS", "1000"))
+WEATHER_RPM = int(os.getenv("WEATHER_RPM", "60"))
+
+# 5-day / 3-hour forecast cache
+FORECAST_CACHE_TTL = int(os.getenv("FORECAST_CACHE_TTL", "1800"))
+FORECAST_CACHE_MAXSIZE = int(os.getenv("FORECAST_CACHE_MAXSIZE", "1024"))
+
+# Offline gazetteer used for city autocomplete and coordinate lookups
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "data/india_places.csv")
+
+# Proactive farm alerts: state store and refresh interval (seconds)
+ALERT_STATE_PATH = os.getenv("ALERT_STATE_PATH", "data/farm_alerts.sqlite")
+ALERT_INTERVAL = int(os.getenv("ALERT_INTERVAL", "1800"))
+
+# Service metrics: Prometheus endpoint port (0 disables) and the ?admin= token for the hidden admin page (empty disables)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Headless API server (api_server.py): bind address, worker processes, per-process threads and concurrency, limits
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+API_THREADS = int(os.getenv("API_THREADS", "16"))
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "64"))
+API_QUEUE_TIMEOUT = float(os.getenv("API_QUEUE_TIMEOUT", "5"))
+API_MAX_BODY_MB = float(os.getenv("API_MAX_BODY_MB", "10"))
+API_REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", "60"))
+
+# Ask Expert memory: exchanges kept verbatim, how many more accumulate before older ones are
+# folded into a rolling summary (capped in tokens), and the input token budget per request
+CHAT_KEEP_TURNS = int(os.getenv("CHAT_KEEP_TURNS", "6"))
+CHAT_FOLD_BATCH = int(os.getenv("CHAT_FOLD_BATCH", "4"))
+CHAT_SUMMARY_TOKENS = int(os.getenv("CHAT_SUMMARY_TOKENS", "300"))
+CHAT_INPUT_TOKEN_BUDGET = int(os.getenv("CHAT_INPUT_TOKEN_BUDGET", "4000"))
+
+# Ask Expert history: messages shown per page, messages kept in session memory before the
+# oldest spill to the local archive, and how long archived messages are kept (seconds)
+CHAT_PAGE_SIZE = int(os.getenv("CHAT_PAGE_SIZE", "20"))
+CHAT_HISTORY_CAP = int(os.getenv("CHAT_HISTORY_CAP", "100"))
+CHAT_ARCHIVE_PATH = os.getenv("CHAT_ARCHIVE_PATH", "data/chat_archive.sqlite")
+CHAT_ARCHIVE_TTL = int(os.getenv("CHAT_ARCHIVE_TTL", str(7 * 24 * 3600)))
+
+# Gemini deadlines per helper (seconds), hedging of text-only prompts still unanswered after
+# GEMINI_HEDGE_DELAY (0 disables), and the circuit breaker: consecutive failures (calls slower
+# than GEMINI_LATENCY_SLO count as failures; 0 disables) before failing fast for the cooldown
+GEMINI_TIMEOUT_CHAT = float(os.getenv("GEMINI_TIMEOUT_CHAT", "20"))
+GEMINI_TIMEOUT_VISION = float(os.getenv("GEMINI_TIMEOUT_VISION", "45"))
+GEMINI_TIMEOUT_RECOMMENDATIONS = float(os.getenv("GEMINI_TIMEOUT_RECOMMENDATIONS", "30"))
+GEMINI_TIMEOUT_WEATHER = float(os.getenv("GEMINI_TIMEOUT_WEATHER", "15"))
+GEMINI_TIMEOUT_SUMMARY = float(os.getenv("GEMINI_TIMEOUT_SUMMARY", "10"))
+GEMINI_HEDGE_DELAY = float(os.getenv("GEMINI_HEDGE_DELAY", "5"))
+GEMINI_CALL_THREADS = int(os.getenv("GEMINI_CALL_THREADS", "64"))
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+GEMINI_LATENCY_SLO = float(os.getenv("GEMINI_LATENCY_SLO", "12"))
+GEMINI_BREAKER_COOLDOWN = float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30"))
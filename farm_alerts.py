@@ -0,0 +1,143 @@
+"""Proactive weather alerts for registered farms.
+
+Each cycle bulk-refreshes current weather for every farm location, runs the
+crop rules over all farms at once, and compares each farm's quantized
+conditions and rule flags with the last evaluated state. Only farms whose
+conditions changed get fresh advice (a Gemini call when configured, rule
+advice otherwise). A farm whose Gemini call failed gets rule advice and is
+evaluated again next cycle. State lives in SQLite, so restarts pick up where they left off.
+
+    python farm_alerts.py --farms farms.csv --once
+    python farm_alerts.py --farms farms.csv --interval 1800 --out alerts.jsonl
+
+farms.csv needs id and crop columns plus either city,state or lat,lon.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from config import ALERT_INTERVAL, ALERT_STATE_PATH, GEMINI_BATCH_CONCURRENCY
+from utils.alert_store import AlertStore
+from utils.crop_rules import RULE_FLAGS, evaluate
+from utils.weather_bands import quantize_weather
+from utils.weather_service import get_weather_many, get_weather_recommendations
+
+
+def load_farms(path):
+    """[(farm_id, location, crop)] where location is (city, state) or (lat, lon)"""
+    farms = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row.get("lat") and row.get("lon"):
+                location = (float(row["lat"]), float(row["lon"]))
+            else:
+                location = (row["city"], row.get("state", ""))
+            farms.append((row["id"], location, row["crop"]))
+    return farms
+
+def _rule_frame(farms, weather):
+    rows = []
+    for (_, _, crop), data in zip(farms, weather):
+        data = data or {}
+        main = data.get("main", {})
+        rows.append((
+            crop,
+            main.get("temp"),
+            main.get("humidity"),
+            (data.get("rain") or {}).get("1h", 0),
+            data.get("wind", {}).get("speed")
+        ))
+    return pd.DataFrame(rows, columns=["crop", "temp", "humidity", "rain_1h", "wind_speed"])
+
+def run_cycle(store, farms, workers, emit):
+    """Evaluate every farm once; returns (changed, unchanged, failed) counts"""
+    results = get_weather_many([location for _, location, _ in farms])
+    weather = [data for data, _ in results]
+    flags = evaluate(_rule_frame(farms, weather))[RULE_FLAGS].to_numpy()
+    previous = store.signatures()
+
+    changed = []
+    failed = 0
+    for i, ((farm_id, location, crop), (data, error)) in enumerate(zip(farms, results)):
+        if error or not data:
+            failed += 1
+            print(f"{farm_id}: weather unavailable: {error}", file=sys.stderr)
+            continue
+        active = [flag for flag, on in zip(RULE_FLAGS, flags[i]) if on and flag != "optimal"]
+        bands = quantize_weather(data)
+        signature = AlertStore.signature(bands, active)
+        if previous.get(str(farm_id)) != signature:
+            changed.append((farm_id, location, crop, data, bands, active, signature))
+
+    def work(item):
+        farm_id, location, crop, data, bands, active, signature = item
+        failures = []
+        advice = get_weather_recommendations(crop, data, failures=failures)
+        # Rule advice standing in for a failed Gemini call is sent but not recorded,
+        # so the next cycle asks Gemini again
+        if not failures:
+            store.put(farm_id, signature, advice)
+        return {
+            "farm_id": farm_id,
+            "location": list(location),
+            "crop": crop,
+            "bands": list(bands),
+            "alerts": active,
+            "advice": advice,
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        }
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(work, item): item for item in changed}
+        for future in as_completed(futures):
+            try:
+                emit(future.result())
+            except Exception as e:
+                failed += 1
+                print(f"{futures[future][0]}: advice failed: {e}", file=sys.stderr)
+
+    unchanged = len(farms) - len(changed) - failed
+    return len(changed), max(unchanged, 0), failed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--farms", required=True, help="CSV of registered farms")
+    parser.add_argument("--store", default=ALERT_STATE_PATH)
+    parser.add_argument("--interval", type=int, default=ALERT_INTERVAL, help="seconds between cycles")
+    parser.add_argument("--workers", type=int, default=GEMINI_BATCH_CONCURRENCY, help="concurrent advice calls")
+    parser.add_argument("--out", help="append alerts as JSON lines to this file instead of stdout")
+    parser.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    args = parser.parse_args()
+
+    farms = load_farms(args.farms)
+    out = open(args.out, "a", encoding="utf-8") if args.out else sys.stdout
+
+    def emit(alert):
+        out.write(json.dumps(alert, ensure_ascii=False) + "\n")
+        out.flush()
+
+    store = AlertStore(args.store)
+    try:
+        while True:
+            started = time.monotonic()
+            changed, unchanged, failed = run_cycle(store, farms, args.workers, emit)
+            print(f"{len(farms)} farms: {changed} changed, {unchanged} unchanged, {failed} failed", file=sys.stderr)
+            if args.once:
+                return 1 if failed else 0
+            time.sleep(max(0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        print("Interrupted; evaluated farms are saved.", file=sys.stderr)
+        return 130
+    finally:
+        store.close()
+        if args.out:
+            out.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
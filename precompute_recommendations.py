@@ -0,0 +1,86 @@
+"""Precompute crop diversification recommendations for every state x soil type.
+
+Results go into the SQLite store served by the Crop Diversification page.
+Finished entries are skipped, so an interrupted run can simply be restarted.
+
+    python precompute_recommendations.py --workers 4 --rpm 60
+    python precompute_recommendations.py --districts districts.json
+"""
+import argparse
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import GEMINI_API_KEY, INDIAN_STATES, SOIL_TYPES, RECOMMENDATION_STORE_PATH
+from utils.gemini_service import PROMPT_VERSION, generate_crop_recommendations
+from utils.rate_limit import RateLimiter
+from utils.recommendation_store import RecommendationStore
+
+
+def build_grid(districts=None):
+    """All (state, soil_type, district) combinations to precompute"""
+    grid = []
+    for state in INDIAN_STATES:
+        for soil_type in SOIL_TYPES:
+            grid.append((state, soil_type, ""))
+            for district in (districts or {}).get(state, []):
+                grid.append((state, soil_type, district))
+    return grid
+
+def run(store, grid, workers, limiter):
+    pending = [item for item in grid if not store.has(*item, PROMPT_VERSION)]
+    print(f"{len(grid) - len(pending)} of {len(grid)} already stored, {len(pending)} to generate")
+    
+    def work(item):
+        state, soil_type, district = item
+        region = f"{district}, {state}" if district else state
+        limiter.acquire()
+        text = generate_crop_recommendations(region, soil_type)
+        store.put(state, soil_type, district, PROMPT_VERSION, text)
+        return item
+    
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(work, item): item for item in pending}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                item = futures[future]
+                try:
+                    future.result()
+                    print(f"[{done}/{len(pending)}] {' / '.join(filter(None, item))}")
+                except Exception as e:
+                    failures += 1
+                    print(f"[{done}/{len(pending)}] FAILED {' / '.join(filter(None, item))}: {e}", file=sys.stderr)
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            print("Interrupted; finished entries are saved, rerun to resume.", file=sys.stderr)
+            raise
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--store", default=RECOMMENDATION_STORE_PATH)
+    parser.add_argument("--workers", type=int, default=4, help="concurrent Gemini calls")
+    parser.add_argument("--rpm", type=int, default=60, help="max Gemini requests per minute")
+    parser.add_argument("--districts", help='JSON file mapping state to a list of districts, e.g. {"Maharashtra": ["Nashik"]}')
+    args = parser.parse_args()
+    
+    if not GEMINI_API_KEY:
+        parser.error("Please set your GEMINI_API_KEY in the .env file")
+    
+    districts = None
+    if args.districts:
+        with open(args.districts, encoding="utf-8") as f:
+            districts = json.load(f)
+    
+    store = RecommendationStore(args.store)
+    try:
+        failures = run(store, build_grid(districts), args.workers, RateLimiter(args.rpm, burst=args.workers))
+    finally:
+        store.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import json
+import time
+import zlib
+
+try:
+    from utils.sqlite_store import SQLiteStore
+except ImportError:
+    from sqlite_store import SQLiteStore
+
+
+class AlertStore(SQLiteStore):
+    """SQLite-backed record of the conditions each farm was last evaluated under"""
+
+    SCHEMA = ("""
+        CREATE TABLE IF NOT EXISTS farm_state (
+            farm_id TEXT PRIMARY KEY,
+            signature TEXT NOT NULL,
+            advice BLOB NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """,)
+
+    @staticmethod
+    def signature(bands, flags):
+        """Stable text form of a farm's quantized conditions and active rule flags"""
+        return json.dumps([list(bands), sorted(flags)], separators=(",", ":"))
+
+    def signatures(self):
+        """{farm_id: signature} for every farm evaluated so far"""
+        with self._lock:
+            rows = self._conn.execute("SELECT farm_id, signature FROM farm_state").fetchall()
+        return dict(rows)
+
+    def put(self, farm_id, signature, advice):
+        """Record one evaluation; committed immediately so restarts don't redo it"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO farm_state VALUES (?, ?, ?, ?)",
+                (str(farm_id), signature, zlib.compress(advice.encode("utf-8"), 9), time.time())
+            )
+            self._conn.commit()
+
+    def advice(self, farm_id):
+        """Last advice sent for a farm, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT advice FROM farm_state WHERE farm_id = ?", (str(farm_id),)
+            ).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else None
@@ -0,0 +1,73 @@
+import time
+import zlib
+
+try:
+    from utils.sqlite_store import SQLiteStore
+except ImportError:
+    from sqlite_store import SQLiteStore
+
+
+# A long-running server opens the archive once, so expired messages are also
+# pruned from append(), at most once per this many seconds
+PRUNE_INTERVAL = 3600
+
+
+class ChatArchive(SQLiteStore):
+    """SQLite-backed spill-over for chat messages that no longer fit in a session's memory.
+
+    Messages are numbered per session from 0 in the order they were sent, so
+    a page of older history is a range query on (session_id, seq).
+    """
+
+    SCHEMA = ("""
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            session_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            body BLOB NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (session_id, seq)
+        ) WITHOUT ROWID
+    """, "CREATE INDEX IF NOT EXISTS chat_messages_age ON chat_messages (created_at)")
+
+    def __init__(self, path, ttl=None):
+        self.ttl = ttl
+        self._pruned_at = 0.0
+        super().__init__(path)
+        if ttl:
+            self.prune(ttl)
+
+    def append(self, session_id, first_seq, messages):
+        """Archive [(role, text)] as seq first_seq, first_seq + 1, ..."""
+        now = time.time()
+        rows = [
+            (session_id, first_seq + i, role, zlib.compress(text.encode("utf-8")), now)
+            for i, (role, text) in enumerate(messages)
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO chat_messages VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+            due = self.ttl and now - self._pruned_at > PRUNE_INTERVAL
+        if due:
+            self.prune(self.ttl)
+
+    def page(self, session_id, start, stop):
+        """[(role, text)] with start <= seq < stop, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, body FROM chat_messages WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, start, stop)
+            ).fetchall()
+        return [(role, zlib.decompress(body).decode("utf-8")) for role, body in rows]
+
+    def forget(self, session_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def prune(self, max_age):
+        """Drop messages archived more than max_age seconds ago"""
+        with self._lock:
+            self._pruned_at = time.time()
+            self._conn.execute("DELETE FROM chat_messages WHERE created_at < ?", (self._pruned_at - max_age,))
+            self._conn.commit()
@@ -0,0 +1,106 @@
+import threading
+import time
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream that the breaker has cut off"""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"{name} is temporarily unavailable; try again in {max(1, round(retry_in))}s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Fails fast while an upstream is unhealthy.
+
+    The breaker opens after `failure_threshold` consecutive failures, where a
+    call that succeeds but takes longer than `slo` seconds also counts as a
+    failure. While open, check() raises CircuitOpenError immediately. After
+    `cooldown` seconds one probe call is let through (half-open): success
+    closes the breaker again, failure re-opens it for another cooldown.
+    """
+
+    def __init__(self, name, failure_threshold=5, slo=None, cooldown=30):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.slo = slo or None
+        self.cooldown = cooldown
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_at = None
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.rejected = 0
+        self.slo_breaches = 0
+
+    def _current(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+            self._probe_at = None
+        return self._state
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current(time.monotonic())
+
+    def allow(self):
+        """True if a call may go ahead now; in half-open state only one probe is admitted"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current(now)
+            if state == CLOSED:
+                return True
+            # A probe whose outcome was never recorded must not block the breaker forever
+            if state == HALF_OPEN and (self._probe_at is None or now - self._probe_at >= self.cooldown):
+                self._probe_at = now
+                return True
+            self.rejected += 1
+            return False
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go ahead now"""
+        if not self.allow():
+            with self._lock:
+                retry_in = self.cooldown - (time.monotonic() - self._opened_at)
+            raise CircuitOpenError(self.name, retry_in)
+
+    def record(self, seconds, ok=True):
+        """Report the outcome and latency of a call admitted by allow() or check()"""
+        with self._lock:
+            now = time.monotonic()
+            if ok and self.slo and seconds > self.slo:
+                self.slo_breaches += 1
+                ok = False
+            if ok:
+                self._state = CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            state = self._current(now)
+            # Late failures of calls admitted before the breaker opened don't extend the cooldown
+            if state == HALF_OPEN or (state == CLOSED and self._failures >= self.failure_threshold):
+                self.opened += 1
+                self._state = OPEN
+                self._opened_at = now
+
+    def reset(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._current(time.monotonic()),
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "slo_breaches": self.slo_breaches
+            }
@@ -0,0 +1,149 @@
+import threading
+
+from config import CHAT_FOLD_BATCH, CHAT_INPUT_TOKEN_BUDGET, CHAT_KEEP_TURNS, CHAT_SUMMARY_TOKENS
+
+
+def estimate_tokens(text):
+    """Local token estimate (about 4 characters per token); no network round trip"""
+    return (len(text) + 3) // 4
+
+def clip_tokens(text, tokens, keep="start"):
+    """Cut text to roughly `tokens` tokens, at a word boundary, keeping its start or its end"""
+    limit = tokens * 4
+    if len(text) <= limit:
+        return text
+    if keep == "end":
+        clipped = text[-limit:]
+        return "…" + clipped[clipped.find(" ") + 1:] if " " in clipped else "…" + clipped
+    clipped = text[:limit]
+    return (clipped.rsplit(" ", 1)[0] if " " in clipped else clipped) + "…"
+
+def _extractive_summary(summary, turns):
+    """Fallback fold without the model: the earlier summary plus the gist of each question"""
+    lines = [summary] if summary else []
+    for question, answer in turns:
+        first = answer.strip().split("\n", 1)[0]
+        lines.append(f"- Farmer asked: {clip_tokens(question.strip(), 40)} / Answer began: {clip_tokens(first, 30)}")
+    return "\n".join(lines)
+
+
+class Conversation:
+    """Bounded memory for a multi-turn chat.
+
+    The last `keep_turns` exchanges are kept verbatim. Once `fold_batch` more
+    have accumulated, the older ones are folded into a rolling summary capped
+    at `summary_tokens`, so prompt size stays flat however long the chat runs.
+    context() fits the summary and recent turns into `token_budget` together
+    with the new question, dropping the oldest turns first. Turns being
+    folded stay in context until their summary is ready.
+    """
+
+    def __init__(self, keep_turns=CHAT_KEEP_TURNS, fold_batch=CHAT_FOLD_BATCH,
+                 summary_tokens=CHAT_SUMMARY_TOKENS, token_budget=CHAT_INPUT_TOKEN_BUDGET,
+                 count_tokens=estimate_tokens):
+        self.keep_turns = max(1, keep_turns)
+        self.fold_batch = max(1, fold_batch)
+        self.summary_tokens = summary_tokens
+        self.token_budget = token_budget
+        self.count_tokens = count_tokens
+        self.summary = ""
+        self.turns = []
+        self.folded = 0
+        self._folding = False
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.folded + len(self.turns)
+
+    def add(self, question, answer, summarize=None, background=False):
+        """Record an exchange; summarize(summary, turns) -> text folds older turns (extractive if absent or failing).
+
+        With background=True the fold runs on a daemon thread and add() returns at once.
+        """
+        with self._lock:
+            self.turns.append((question, answer))
+            if self._folding or len(self.turns) < self.keep_turns + self.fold_batch:
+                return
+            self._folding = True
+            older = self.turns[:-self.keep_turns]
+            summary, generation = self.summary, self._generation
+
+        if background:
+            threading.Thread(target=self._fold, args=(summary, older, summarize, generation), daemon=True).start()
+        else:
+            self._fold(summary, older, summarize, generation)
+
+    def _fold(self, summary, older, summarize, generation):
+        text = None
+        if summarize is not None:
+            try:
+                text = summarize(summary, older)
+            except Exception:
+                text = None
+        if not text:
+            text = _extractive_summary(summary, older)
+
+        with self._lock:
+            if generation != self._generation:
+                # Cleared while the summary was being written
+                return
+            self.summary = clip_tokens(text.strip(), self.summary_tokens, keep="end")
+            # Only appends happen while folding, so the folded turns are still the oldest ones
+            del self.turns[:len(older)]
+            self.folded += len(older)
+            self._folding = False
+
+    def clear(self):
+        with self._lock:
+            self.summary = ""
+            self.turns = []
+            self.folded = 0
+            self._folding = False
+            self._generation += 1
+
+    def context(self, question, reserve=0):
+        """(summary, turns) that fit the token budget alongside question and `reserve` prompt tokens"""
+        with self._lock:
+            summary, turns = self.summary, list(self.turns)
+
+        budget = self.token_budget - reserve - self.count_tokens(question)
+        used = self.count_tokens(summary)
+        if used > budget:
+            summary = clip_tokens(summary, max(0, budget), keep="end")
+            used = self.count_tokens(summary)
+
+        kept = []
+        for past_question, past_answer in reversed(turns):
+            cost = self.count_tokens(past_question) + self.count_tokens(past_answer)
+            if used + cost > budget:
+                # Keep a clipped copy of the latest exchange rather than losing it entirely
+                room = budget - used - self.count_tokens(past_question)
+                if not kept and room > 50:
+                    kept.append((past_question, clip_tokens(past_answer, room)))
+                break
+            kept.append((past_question, past_answer))
+            used += cost
+        kept.reverse()
+        return summary, kept
+
+    def transcript(self, question, reserve=0):
+        """Earlier conversation rendered for the prompt; empty for the first question"""
+        summary, turns = self.context(question, reserve)
+        parts = []
+        if summary:
+            parts.append(f"Summary of the earlier conversation:\n{summary}")
+        if turns:
+            parts.append("Recent conversation:\n" + "\n".join(
+                f"Farmer: {past_question}\nAssistant: {past_answer}" for past_question, past_answer in turns
+            ))
+        return "\n\n".join(parts)
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from config import ALL_CROPS
+
+
+# Per-crop agronomic limits: optimal temperature band, frost and heat stress
+# temperatures (°C), relative humidity (%) above which fungal disease pressure
+# rises, hourly rainfall (mm) that risks waterlogging, and wind (m/s) that
+# risks lodging or spray drift.
+THRESHOLD_COLUMNS = ["opt_min", "opt_max", "frost", "heat", "humid", "rain", "wind"]
+
+CROP_THRESHOLDS = pd.DataFrame.from_dict({
+    "Rice":         (20, 35, 10, 40, 90, 50, 12),
+    "Wheat":        (12, 25, -2, 32, 80, 10, 10),
+    "Maize":        (18, 32, 2, 38, 85, 15, 10),
+    "Bajra":        (25, 35, 8, 42, 80, 15, 12),
+    "Jowar":        (22, 34, 6, 40, 80, 15, 12),
+    "Ragi":         (20, 32, 5, 38, 80, 15, 12),
+    "Chickpea":     (15, 28, 0, 35, 75, 8, 12),
+    "Pigeon Pea":   (20, 32, 4, 38, 80, 10, 10),
+    "Lentils":      (12, 25, -1, 32, 75, 8, 12),
+    "Moong":        (25, 35, 10, 40, 80, 8, 12),
+    "Urad":         (25, 35, 10, 40, 80, 8, 12),
+    "Black Gram":   (25, 35, 10, 40, 80, 8, 12),
+    "Groundnut":    (22, 32, 8, 38, 80, 10, 12),
+    "Mustard":      (10, 25, -2, 32, 75, 8, 12),
+    "Soybean":      (20, 30, 5, 36, 85, 12, 10),
+    "Sunflower":    (18, 30, 3, 38, 75, 10, 8),
+    "Sesame":       (25, 35, 10, 40, 75, 6, 10),
+    "Cotton":       (21, 35, 5, 42, 80, 10, 10),
+    "Sugarcane":    (20, 35, 5, 42, 85, 25, 8),
+    "Jute":         (24, 35, 10, 40, 95, 40, 10),
+    "Tobacco":      (20, 30, 3, 35, 80, 8, 8),
+    "Tomato":       (18, 29, 2, 35, 80, 8, 8),
+    "Onion":        (13, 25, -1, 35, 75, 8, 12),
+    "Potato":       (15, 24, -1, 30, 80, 10, 12),
+    "Cabbage":      (12, 24, -3, 30, 80, 10, 12),
+    "Cauliflower":  (15, 22, -1, 30, 80, 10, 12),
+    "Brinjal":      (21, 30, 5, 37, 80, 8, 10),
+    "Okra":         (22, 35, 10, 40, 80, 8, 10),
+    "Mango":        (24, 30, 2, 45, 80, 15, 10),
+    "Banana":       (20, 32, 8, 38, 85, 15, 8),
+    "Citrus":       (15, 30, -2, 40, 80, 12, 10),
+    "Grapes":       (15, 35, 0, 40, 75, 8, 10),
+    "Pomegranate":  (20, 35, -2, 42, 70, 8, 10),
+    "Guava":        (20, 30, 2, 42, 80, 12, 10),
+    "Turmeric":     (20, 30, 10, 38, 90, 20, 10),
+    "Chili":        (20, 30, 5, 35, 80, 8, 8),
+    "Coriander":    (15, 25, 0, 32, 75, 6, 10),
+    "Cumin":        (15, 25, 0, 30, 70, 4, 10),
+    "Cardamom":     (15, 25, 5, 32, 95, 30, 8),
+    "Black Pepper": (20, 30, 10, 38, 95, 30, 8),
+}, orient="index", columns=THRESHOLD_COLUMNS, dtype="float32")
+
+# Used when no crop is selected or the crop is not in the table; heat stress
+# starts above 35°C, as the generic advice always had it
+DEFAULT_THRESHOLDS = (15, 35, 2, 36, 80, 5, 15)
+DEFAULT_LABEL = "most crops"
+
+assert set(CROP_THRESHOLDS.index) == set(ALL_CROPS), "CROP_THRESHOLDS must cover ALL_CROPS"
+
+LOW_HUMIDITY = 40
+
+# (flag, condition over the joined frame, message); flags are evaluated in order
+RULES = [
+    ("frost", lambda f: f["temp"] <= f["frost"],
+     "❄️ Frost risk for {crop} (at or below {frost:g}°C). Cover seedlings and irrigate lightly in the evening."),
+    ("cold", lambda f: (f["temp"] > f["frost"]) & (f["temp"] < f["opt_min"]),
+     "⚠️ Below the optimal range for {crop} ({opt_min:g}–{opt_max:g}°C). Growth will slow; protect young plants."),
+    ("optimal", lambda f: (f["temp"] >= f["opt_min"]) & (f["temp"] <= f["opt_max"]),
+     "✅ Temperature is within the optimal range for {crop}."),
+    ("warm", lambda f: (f["temp"] > f["opt_max"]) & (f["temp"] < f["heat"]),
+     "🌡️ Warmer than ideal for {crop} ({opt_min:g}–{opt_max:g}°C). Ensure adequate irrigation."),
+    ("heat", lambda f: f["temp"] >= f["heat"],
+     "🔥 Heat stress for {crop} (at or above {heat:g}°C). Irrigate in the early morning or evening and mulch to retain moisture."),
+    ("disease", lambda f: f["humidity"] > f["humid"],
+     "💧 High humidity raises fungal disease risk for {crop}. Scout leaves regularly and ensure proper ventilation."),
+    ("dry", lambda f: f["humidity"] < LOW_HUMIDITY,
+     "🌵 Low humidity. Increase irrigation frequency if needed."),
+    ("waterlogging", lambda f: f["rain_1h"] > f["rain"],
+     "🌧️ Heavy rainfall for {crop}. Ensure proper drainage to prevent waterlogging."),
+    ("wind", lambda f: f["wind_speed"] >= f["wind"],
+     "💨 Strong winds can damage or lodge {crop}. Avoid spraying and support tall plants."),
+]
+RULE_FLAGS = [flag for flag, _, _ in RULES]
+
+
+# Threshold matrix with the defaults as its last row, for index-based lookups
+_LIMITS = np.vstack([CROP_THRESHOLDS.to_numpy(), np.array(DEFAULT_THRESHOLDS, dtype=np.float32)])
+_ROWS = {crop: i for i, crop in enumerate(CROP_THRESHOLDS.index)}
+_DEFAULT_ROW = len(_ROWS)
+
+# The temperature rules assume frost < opt_min <= opt_max < heat, so at most one of them fires
+_BANDS = _LIMITS[:, [THRESHOLD_COLUMNS.index(c) for c in ("frost", "opt_min", "opt_max", "heat")]]
+assert ((_BANDS[:, 0] < _BANDS[:, 1]) & (_BANDS[:, 1] <= _BANDS[:, 2]) & (_BANDS[:, 2] < _BANDS[:, 3])).all(), \
+    "every threshold row needs frost < opt_min <= opt_max < heat"
+
+
+def _as_floats(values, fill=None):
+    values = pd.to_numeric(pd.Series(values), errors="coerce")
+    if fill is not None:
+        values = values.fillna(fill)
+    return values.to_numpy(dtype=np.float32)
+
+def _evaluate(crops, temp, humidity, rain_1h, wind_speed):
+    """Rule flags as {flag: bool array}; the threshold join is a single fancy-index"""
+    rows = np.fromiter((_ROWS.get(crop, _DEFAULT_ROW) for crop in crops), dtype=np.intp, count=len(crops))
+    limits = _LIMITS[rows]
+    joined = {column: limits[:, i] for i, column in enumerate(THRESHOLD_COLUMNS)}
+    joined["temp"] = temp
+    joined["humidity"] = humidity
+    joined["rain_1h"] = rain_1h
+    joined["wind_speed"] = wind_speed
+
+    valid = ~np.isnan(temp)
+    return {flag: condition(joined) & valid for flag, condition, _ in RULES}
+
+def evaluate(frame):
+    """Evaluate every rule over many (location, crop) rows at once.
+
+    frame needs crop, temp, humidity, rain_1h and wind_speed columns (the
+    get_weather_bulk layout plus a crop column). Returns a boolean DataFrame
+    with one column per rule flag, indexed like frame. Rows without a
+    temperature, e.g. failed lookups, get no flags.
+    """
+    flags = _evaluate(
+        frame["crop"].tolist(),
+        _as_floats(frame["temp"]),
+        _as_floats(frame["humidity"], fill=0),
+        _as_floats(frame["rain_1h"], fill=0),
+        _as_floats(frame["wind_speed"], fill=0)
+    )
+    return pd.DataFrame(flags, index=frame.index)
+
+def screen(frame):
+    """frame with rule flags and an alert count appended; 'optimal' is not an alert"""
+    flags = evaluate(frame)
+    alerts = flags.drop(columns="optimal").sum(axis=1)
+    return frame.join(flags).assign(alerts=alerts)
+
+def rule_based_advice(crop_name, weather_data):
+    """Crop-aware advice lines from the threshold table, without any LLM call"""
+    main = weather_data.get("main", {})
+    flags = _evaluate(
+        [crop_name],
+        np.array([main.get("temp", np.nan)], dtype=np.float32),
+        np.array([main.get("humidity") or 0], dtype=np.float32),
+        np.array([(weather_data.get("rain") or {}).get("1h") or 0], dtype=np.float32),
+        np.array([weather_data.get("wind", {}).get("speed") or 0], dtype=np.float32)
+    )
+    row = _ROWS.get(crop_name, _DEFAULT_ROW)
+    values = dict(zip(THRESHOLD_COLUMNS, _LIMITS[row].tolist()))
+    values["crop"] = crop_name if row != _DEFAULT_ROW else DEFAULT_LABEL
+    return [message.format(**values) for flag, _, message in RULES if flags[flag][0]]
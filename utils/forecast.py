@@ -0,0 +1,77 @@
+import time
+
+import numpy as np
+
+
+STEP_SECONDS = 3 * 3600
+
+
+def _column(items, getter, dtype):
+    return np.fromiter((getter(item) for item in items), dtype=dtype, count=len(items))
+
+
+class ForecastSeries:
+    """5-day / 3-hour forecast for one location as parallel NumPy arrays.
+
+    Parsed once from the OpenWeather payload; the query helpers are vectorized
+    over the arrays, so evaluating many crops against one forecast is cheap.
+    """
+
+    __slots__ = ("time", "temp", "humidity", "rain", "wind", "pop")
+
+    def __init__(self, time, temp, humidity, rain, wind, pop):
+        self.time = time
+        self.temp = temp
+        self.humidity = humidity
+        self.rain = rain
+        self.wind = wind
+        self.pop = pop
+
+    @classmethod
+    def from_openweather(cls, payload):
+        items = payload.get("list", [])
+        return cls(
+            time=_column(items, lambda i: i.get("dt", 0), np.int64),
+            temp=_column(items, lambda i: i.get("main", {}).get("temp", np.nan), np.float32),
+            humidity=_column(items, lambda i: i.get("main", {}).get("humidity", np.nan), np.float32),
+            rain=_column(items, lambda i: (i.get("rain") or {}).get("3h", 0.0), np.float32),
+            wind=_column(items, lambda i: i.get("wind", {}).get("speed", np.nan), np.float32),
+            pop=_column(items, lambda i: i.get("pop", 0.0), np.float32)
+        )
+
+    def __len__(self):
+        return len(self.time)
+
+    def window(self, hours, now=None):
+        """Boolean mask of steps overlapping the next `hours` hours"""
+        now = time.time() if now is None else now
+        return (self.time + STEP_SECONDS > now) & (self.time < now + hours * 3600)
+
+    def total_rain(self, hours=24, now=None):
+        return float(self.rain[self.window(hours, now)].sum())
+
+    def rain_expected(self, hours=24, threshold_mm=1.0, now=None):
+        """True if at least threshold_mm of rain is forecast within the next `hours` hours"""
+        return self.total_rain(hours, now) >= threshold_mm
+
+    def max_temp(self, days=3, now=None):
+        values = self.temp[self.window(days * 24, now)]
+        return float(np.nanmax(values)) if values.size else None
+
+    def min_temp(self, days=3, now=None):
+        values = self.temp[self.window(days * 24, now)]
+        return float(np.nanmin(values)) if values.size else None
+
+    def max_wind(self, hours=24, now=None):
+        values = self.wind[self.window(hours, now)]
+        return float(np.nanmax(values)) if values.size else None
+
+    def summary(self, now=None):
+        """Headline numbers used by the recommendation rules"""
+        return {
+            "rain_next_24h_mm": self.total_rain(24, now),
+            "rain_next_72h_mm": self.total_rain(72, now),
+            "max_temp_next_3d": self.max_temp(3, now),
+            "min_temp_next_3d": self.min_temp(3, now),
+            "max_wind_next_24h": self.max_wind(24, now)
+        }
@@ -0,0 +1,133 @@
+import bisect
+import csv
+import difflib
+import os
+import threading
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+
+from config import GAZETTEER_PATH
+
+
+Place = namedtuple("Place", ["name", "state", "lat", "lon"])
+
+
+def fold(text):
+    """Case-, accent- and punctuation-insensitive form of a place name"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch if ch.isalnum() else " " for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.casefold().split())
+
+
+class Gazetteer:
+    """In-memory index of Indian places for offline autocomplete and geocoding.
+
+    Every name and alias is folded and kept in one sorted list, so prefix
+    lookups are a bisect plus a short scan. Coordinates live in float32
+    arrays parallel to the place rows.
+    """
+
+    def __init__(self, rows=()):
+        names, states, lats, lons = [], [], [], []
+        keys = []
+        for name, state, lat, lon, aliases in rows:
+            index = len(names)
+            names.append(name)
+            states.append(state)
+            lats.append(float(lat))
+            lons.append(float(lon))
+            for label in {name, *aliases}:
+                key = fold(label)
+                if key:
+                    keys.append((key, index))
+        keys.sort()
+        self._names = names
+        self._states = states
+        self._lat = np.array(lats, dtype=np.float32)
+        self._lon = np.array(lons, dtype=np.float32)
+        self._keys = [key for key, _ in keys]
+        self._rows = [index for _, index in keys]
+
+    @classmethod
+    def from_csv(cls, path):
+        """Load a name,state,lat,lon,aliases CSV; aliases are separated by '|'"""
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = [
+                (row["name"], row["state"], row["lat"], row["lon"],
+                 [alias for alias in (row.get("aliases") or "").split("|") if alias])
+                for row in csv.DictReader(f)
+            ]
+        return cls(rows)
+
+    def __len__(self):
+        return len(self._names)
+
+    def _place(self, index):
+        return Place(
+            self._names[index], self._states[index],
+            round(float(self._lat[index]), 4), round(float(self._lon[index]), 4)
+        )
+
+    def _matches(self, key):
+        """Row indices whose folded name or alias is exactly key"""
+        start = bisect.bisect_left(self._keys, key)
+        end = bisect.bisect_right(self._keys, key, start)
+        return self._rows[start:end]
+
+    def _in_state(self, indices, state):
+        if not state:
+            return list(indices)
+        state = fold(state)
+        return [i for i in indices if fold(self._states[i]) == state]
+
+    def resolve(self, city, state=""):
+        """Exact (alias-aware) lookup; None if the city is unknown or ambiguous across states"""
+        indices = self._in_state(self._matches(fold(city)), state)
+        if len({self._states[i] for i in indices}) != 1:
+            return None
+        return self._place(indices[0])
+
+    def search(self, query, state="", limit=8):
+        """Places whose name starts with query, topped up with close misspellings"""
+        key = fold(query)
+        if not key or limit <= 0:
+            return []
+
+        found = {}
+        start = bisect.bisect_left(self._keys, key)
+        for i in range(start, len(self._keys)):
+            if len(found) >= limit or not self._keys[i].startswith(key):
+                break
+            for index in self._in_state([self._rows[i]], state):
+                found[index] = None
+
+        if len(found) < limit:
+            # Fuzzy candidates: names of similar length sharing the first letter
+            first = key[0]
+            lo = bisect.bisect_left(self._keys, first)
+            hi = bisect.bisect_left(self._keys, chr(ord(first) + 1), lo)
+            candidates = {
+                k: None for k in self._keys[lo:hi] if abs(len(k) - len(key)) <= 2
+            }
+            for close in difflib.get_close_matches(key, list(candidates), n=limit, cutoff=0.75):
+                for index in self._in_state(self._matches(close), state):
+                    found[index] = None
+
+        return [self._place(i) for i in list(found)[:limit]]
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer():
+    """Process-wide gazetteer, loaded on first use; empty if the data file is missing"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                if os.path.exists(GAZETTEER_PATH):
+                    _gazetteer = Gazetteer.from_csv(GAZETTEER_PATH)
+                else:
+                    _gazetteer = Gazetteer()
+    return _gazetteer
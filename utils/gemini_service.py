@@ -1,27 +1,709 @@
-import google.generativeai as genai
-from config import GEMINI_API_KEY
-from PIL import Image
+from config import (
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    GEMINI_VISION_MODEL,
+    GEMINI_WARMUP_PING,
+    IMAGE_MAX_SIDE,
+    IMAGE_JPEG_QUALITY,
+    IMAGE_MAX_PIXELS,
+    IMAGE_CACHE_MAXSIZE,
+    IMAGE_HASH_THRESHOLD,
+    WEATHER_ADVICE_CACHE_TTL,
+    WEATHER_ADVICE_CACHE_MAXSIZE,
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_PATH,
+    RESPONSE_CACHE_MAX_MB,
+    RESPONSE_CACHE_TTL,
+    GEMINI_RPM,
+    GEMINI_TPM,
+    GEMINI_EXPECTED_OUTPUT_TOKENS,
+    GEMINI_BATCH_CONCURRENCY,
+    GEMINI_TIMEOUT_CHAT,
+    GEMINI_TIMEOUT_VISION,
+    GEMINI_TIMEOUT_RECOMMENDATIONS,
+    GEMINI_TIMEOUT_WEATHER,
+    GEMINI_TIMEOUT_SUMMARY,
+    GEMINI_HEDGE_DELAY,
+    GEMINI_CALL_THREADS,
+    GEMINI_BREAKER_FAILURES,
+    GEMINI_LATENCY_SLO,
+    GEMINI_BREAKER_COOLDOWN
+)
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+import asyncio
+import hashlib
 import io
+import queue
+import sqlite3
+import threading
+import time
 
+try:
+    from utils.cache import TTLCache
+    from utils.circuit_breaker import OPEN, CircuitBreaker, CircuitOpenError
+    from utils.image_cache import ImageResultCache, dhash
+    from utils.metrics import (
+        breaker_gauges, cache_gauges, instrument, limiter_gauges, propagate, record_bytes, record_error,
+        record_event, record_tokens, record_upstream, register_collector, single_flight_gauges
+    )
+    from utils.rate_limit import RateLimiter
+    from utils.response_cache import ResponseCache, make_key
+    from utils.single_flight import SingleFlight
+    from utils.weather_bands import quantize_weather, describe_bands
+except ImportError:
+    from cache import TTLCache
+    from circuit_breaker import OPEN, CircuitBreaker, CircuitOpenError
+    from image_cache import ImageResultCache, dhash
+    from metrics import (
+        breaker_gauges, cache_gauges, instrument, limiter_gauges, propagate, record_bytes, record_error,
+        record_event, record_tokens, record_upstream, register_collector, single_flight_gauges
+    )
+    from rate_limit import RateLimiter
+    from response_cache import ResponseCache, make_key
+    from single_flight import SingleFlight
+    from weather_bands import quantize_weather, describe_bands
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
 
-def analyze_crop_disease(image, crop_name=""):
-    """Analyze crop disease from image using Gemini Vision"""
+# Bump whenever a prompt template changes so cached answers are not reused
+PROMPT_VERSION = "1"
+
+
+_image_results = ImageResultCache(maxsize=IMAGE_CACHE_MAXSIZE, threshold=IMAGE_HASH_THRESHOLD)
+_weather_advice = TTLCache(maxsize=WEATHER_ADVICE_CACHE_MAXSIZE, ttl=WEATHER_ADVICE_CACHE_TTL)
+_weather_bands_seen = set()
+_weather_bands_lock = threading.Lock()
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+# Shared by every thread in the process so batch work stays within quota
+_gemini_limiter = RateLimiter(GEMINI_RPM)
+_gemini_token_limiter = RateLimiter(GEMINI_TPM)
+# Concurrent identical prompts share one upstream call
+_gemini_flight = SingleFlight()
+# Calls run on this pool so the caller can stop waiting at the deadline; the breaker
+# fails calls fast while Gemini keeps erroring or answering slower than the SLO
+_gemini_calls = ThreadPoolExecutor(max_workers=max(1, GEMINI_CALL_THREADS), thread_name_prefix="gemini-call")
+_gemini_breaker = CircuitBreaker(
+    "Gemini", failure_threshold=GEMINI_BREAKER_FAILURES, slo=GEMINI_LATENCY_SLO, cooldown=GEMINI_BREAKER_COOLDOWN
+)
+
+# Gemini bills each inline image as a fixed number of tokens
+IMAGE_TOKENS = 258
+
+_genai = None
+_models = {}
+_models_lock = threading.Lock()
+
+def configure_gemini():
+    """Import and configure the Gemini SDK once per process; returns the genai module.
+
+    The SDK and its grpc/protobuf stack take most of a second to import, so
+    nothing loads it until a model is first needed.
+    """
+    global _genai
+    if _genai is None:
+        with _models_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                if GEMINI_API_KEY:
+                    genai.configure(api_key=GEMINI_API_KEY)
+                _genai = genai
+    return _genai
+
+def get_model(model_name=GEMINI_MODEL):
+    """Return the process-wide GenerativeModel for model_name, creating it once"""
+    model = _models.get(model_name)
+    if model is None:
+        genai = configure_gemini()
+        with _models_lock:
+            model = _models.get(model_name)
+            if model is None:
+                model = genai.GenerativeModel(model_name)
+                _models[model_name] = model
+    return model
+
+def warm_up_models():
+    """Build the configured models ahead of the first user request"""
+    if not GEMINI_API_KEY:
+        return False
+    for model_name in {GEMINI_MODEL, GEMINI_VISION_MODEL}:
+        model = get_model(model_name)
+        if GEMINI_WARMUP_PING:
+            # count_tokens is free and opens the underlying channel
+            try:
+                model.count_tokens("ping")
+            except Exception:
+                return False
+    return True
+
+@instrument
+def preprocess_image(image, max_side=IMAGE_MAX_SIDE, quality=IMAGE_JPEG_QUALITY):
+    """Orient, downscale and re-encode an image into a compact JPEG blob for Gemini.
+    
+    The result also carries the image's perceptual hash under "dhash".
+    """
+    from PIL import Image, ImageOps
+    
+    if isinstance(image, dict) and "data" in image:
+        # Already preprocessed
+        if "dhash" not in image:
+            image = dict(image, dhash=dhash(Image.open(io.BytesIO(image["data"]))))
+        return image
+    if isinstance(image, bytes):
+        image = Image.open(io.BytesIO(image))
+    elif not isinstance(image, Image.Image):
+        image = Image.open(image)
+    
+    width, height = image.size
+    if width * height > IMAGE_MAX_PIXELS:
+        raise ValueError(
+            f"Image is too large ({width}x{height}). Please upload a photo under {IMAGE_MAX_PIXELS // 1_000_000} MP."
+        )
+    
+    # Let the JPEG decoder scale down by a power of two while decoding.
+    # draft() keeps both sides at or above the requested size, so ask for
+    # the final thumbnail dimensions rather than a max_side square.
+    if image.format == "JPEG" and max(width, height) > max_side:
+        scale = max_side / max(width, height)
+        image.draft("RGB", (int(width * scale), int(height * scale)))
+    
+    image = ImageOps.exif_transpose(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.BICUBIC, reducing_gap=3.0)
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return {"mime_type": "image/jpeg", "data": buffer.getvalue(), "dhash": dhash(image)}
+
+def _image_blob(image):
+    """Strip bookkeeping keys so only the Blob fields reach the SDK"""
+    return {"mime_type": image["mime_type"], "data": image["data"]}
+
+def _image_cache_slot(kind, image, crop_name=""):
+    """Return (lookup, store) callables for the perceptual-hash result cache"""
+    namespace = (kind, crop_name, PROMPT_VERSION)
+    image_hash = image["dhash"]
+    return (
+        lambda: _image_results.get(namespace, image_hash),
+        lambda text: _image_results.set(namespace, image_hash, text)
+    )
+
+def get_image_cache_stats():
+    """Return hit/miss counters for the image analysis cache"""
+    return _image_results.stats()
+
+def get_response_cache():
+    """Return the shared on-disk response cache, or None when disabled or unavailable"""
+    global _response_cache
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                try:
+                    _response_cache = ResponseCache(
+                        RESPONSE_CACHE_PATH,
+                        max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+                        ttl=RESPONSE_CACHE_TTL
+                    )
+                except (sqlite3.Error, OSError):
+                    # Run uncached rather than fail requests
+                    _response_cache = False
+    return _response_cache or None
+
+def _request_key(model, contents):
+    """Identity of a request: model, normalized prompt, image digest and prompt version"""
+    parts = [contents] if isinstance(contents, str) else contents
+    prompt = "\n".join(part for part in parts if isinstance(part, str))
+    image_digest = "".join(
+        hashlib.sha256(part["data"]).hexdigest() for part in parts if isinstance(part, dict)
+    )
+    return make_key(model.model_name, prompt, image_digest, PROMPT_VERSION)
+
+def _response_cache_slot(key):
+    """Return (lookup, store) callables for the on-disk cache; cache errors count as misses"""
+    cache = get_response_cache()
+    if cache is None:
+        return lambda: None, lambda text: None
+    
+    def lookup():
+        try:
+            return cache.get(key)
+        except sqlite3.Error:
+            return None
+    
+    def store(text):
+        if not text:
+            return
+        try:
+            cache.set(key, text)
+        except sqlite3.Error:
+            pass
+    
+    return lookup, store
+
+def _estimate_tokens(contents):
+    """Rough pre-call token estimate (about 4 characters per token) plus expected output"""
+    parts = [contents] if isinstance(contents, str) else contents
+    tokens = GEMINI_EXPECTED_OUTPUT_TOKENS
+    for part in parts:
+        tokens += len(part) // 4 if isinstance(part, str) else IMAGE_TOKENS
+    return tokens
+
+def _settle_tokens(response, estimate):
+    """Correct the token bucket once the real usage is reported"""
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", 0) if usage is not None else 0
+    if usage is not None:
+        record_tokens(getattr(usage, "prompt_token_count", 0), getattr(usage, "candidates_token_count", 0))
+    if total:
+        _gemini_token_limiter.adjust(total - estimate)
+
+def get_gemini_quota_stats():
+    """Return queue depth and wait times of the Gemini rate limits, plus request coalescing counts"""
+    return {
+        "requests": _gemini_limiter.stats(),
+        "tokens": _gemini_token_limiter.stats(),
+        "single_flight": _gemini_flight.stats(),
+        "breaker": _gemini_breaker.stats()
+    }
+
+def gemini_circuit_open():
+    """True while Gemini calls fail fast; pages use it to go straight to local answers"""
+    return _gemini_breaker.state == OPEN
+
+def _stale_lookup(key):
+    """An expired on-disk answer for key, served when Gemini fails or is cut off"""
+    cache = get_response_cache()
+    if cache is None:
+        return None
     try:
-        if not GEMINI_API_KEY:
-            return "GEMINI_API_KEY missing"
-        
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        text = cache.get(key, stale=True)
+    except sqlite3.Error:
+        return None
+    if not text:
+        return None
+    record_event("gemini", "stale")
+    return text
+
+def _upload_bytes(contents):
+    parts = [contents] if isinstance(contents, str) else contents
+    return sum(len(part.encode("utf-8")) if isinstance(part, str) else len(part["data"]) for part in parts)
+
+def _reserve(contents):
+    """Wait for request and token quota; returns the token estimate to settle once usage is known"""
+    estimate = _estimate_tokens(contents)
+    _gemini_limiter.acquire()
+    _gemini_token_limiter.acquire(estimate)
+    return estimate
+
+async def _reserve_async(contents):
+    estimate = _estimate_tokens(contents)
+    await _gemini_limiter.acquire_async()
+    await _gemini_token_limiter.acquire_async(estimate)
+    return estimate
+
+def _refund(estimate):
+    """Give back quota reserved for an attempt that never reached Gemini"""
+    _gemini_limiter.adjust(-1)
+    _gemini_token_limiter.adjust(-estimate)
+
+def _call_model(model, contents, estimate=None):
+    """One upstream generate_content call, queued behind the request and token buckets unless already reserved"""
+    if estimate is None:
+        estimate = _reserve(contents)
+    start = time.perf_counter()
+    try:
+        response = model.generate_content(contents)
+        text = response.text
+    except Exception as e:
+        record_upstream("gemini", time.perf_counter() - start, type(e).__name__)
+        raise
+    record_upstream("gemini", time.perf_counter() - start, "ok")
+    record_bytes("gemini", "upload", _upload_bytes(contents))
+    record_bytes("gemini", "download", len(text.encode("utf-8")))
+    _settle_tokens(response, estimate)
+    return text
+
+async def _call_model_async(model, contents, estimate=None):
+    if estimate is None:
+        estimate = await _reserve_async(contents)
+    start = time.perf_counter()
+    try:
+        response = await model.generate_content_async(contents)
+        text = response.text
+    except Exception as e:
+        record_upstream("gemini", time.perf_counter() - start, type(e).__name__)
+        raise
+    record_upstream("gemini", time.perf_counter() - start, "ok")
+    record_bytes("gemini", "upload", _upload_bytes(contents))
+    record_bytes("gemini", "download", len(text.encode("utf-8")))
+    _settle_tokens(response, estimate)
+    return text
+
+def _transient(error):
+    """True for failures worth retrying and blaming on Gemini: timeouts, overload and server errors.
+    
+    Client errors (a safety-blocked answer, an invalid argument) would fail
+    the same way again and say nothing about Gemini's health.
+    """
+    if isinstance(error, TimeoutError):
+        return True
+    try:
+        from google.api_core import exceptions
+    except ImportError:
+        return False
+    return isinstance(error, (
+        exceptions.DeadlineExceeded, exceptions.ServiceUnavailable,
+        exceptions.InternalServerError, exceptions.ResourceExhausted
+    ))
+
+def _admit():
+    try:
+        _gemini_breaker.check()
+    except CircuitOpenError:
+        record_event("gemini", "rejected")
+        raise
+
+def _hedge_delay(contents, deadline):
+    """Seconds before a duplicate is sent, or None.
+    
+    Every prompt here is a read without side effects, but only text-only ones
+    are hedged: a second image upload costs more than it saves.
+    """
+    if GEMINI_HEDGE_DELAY > 0 and isinstance(contents, str) and GEMINI_HEDGE_DELAY < deadline:
+        return GEMINI_HEDGE_DELAY
+    return None
+
+def _call_bounded(model, contents, deadline):
+    """_call_model behind the circuit breaker, answering or failing within deadline seconds.
+    
+    Quota for the first attempt is reserved before the deadline clock starts,
+    and the breaker is only charged from the moment an attempt reaches Gemini,
+    so local queueing is never blamed on the upstream. A text-only prompt
+    still unanswered after GEMINI_HEDGE_DELAY, or failing transiently before
+    then, is sent once more and the first answer wins. Client errors are
+    raised at once without touching the breaker. The SDK cannot cancel a call:
+    an attempt still queued when the caller gives up skips Gemini, one already
+    sent finishes on the pool and its answer is dropped.
+    """
+    _admit()
+    estimate = _reserve(contents)
+    cancelled = threading.Event()
+    sent = []
+    
+    def attempt(estimate=None):
+        if estimate is None:
+            estimate = _reserve(contents)
+        if cancelled.is_set():
+            _refund(estimate)
+            return None
+        sent.append(time.perf_counter())
+        return _call_model(model, contents, estimate)
+    
+    start = time.perf_counter()
+    hedge_at = _hedge_delay(contents, deadline)
+    call = propagate(attempt)
+    primary = _gemini_calls.submit(call, estimate)
+    pending = {primary}
+    error = None
+    try:
+        while True:
+            elapsed = time.perf_counter() - start
+            if hedge_at is not None and (elapsed >= hedge_at or not pending):
+                hedge_at = None
+                record_event("gemini", "hedged")
+                pending.add(_gemini_calls.submit(call))
+            if not pending or elapsed >= deadline:
+                break
+            done, pending = wait(
+                pending, timeout=(deadline if hedge_at is None else hedge_at) - elapsed, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                if future.exception() is None:
+                    _gemini_breaker.record(time.perf_counter() - min(sent))
+                    if future is not primary:
+                        record_event("gemini", "hedge_won")
+                    return future.result()
+                error = future.exception()
+                if not _transient(error):
+                    # Neither hedged nor counted against the breaker
+                    raise error
+    finally:
+        cancelled.set()
+    
+    if sent:
+        _gemini_breaker.record(time.perf_counter() - min(sent), ok=False)
+    if pending:
+        record_event("gemini", "deadline")
+        raise TimeoutError(f"request timed out after {deadline:g}s")
+    raise error
+
+async def _call_bounded_async(model, contents, deadline):
+    """Async counterpart of _call_bounded; late attempts are cancelled"""
+    _admit()
+    estimate = await _reserve_async(contents)
+    sent = []
+    
+    async def attempt(estimate=None):
+        if estimate is None:
+            estimate = await _reserve_async(contents)
+        sent.append(time.perf_counter())
+        return await _call_model_async(model, contents, estimate)
+    
+    start = time.perf_counter()
+    hedge_at = _hedge_delay(contents, deadline)
+    primary = asyncio.ensure_future(attempt(estimate))
+    pending = {primary}
+    error = None
+    try:
+        while True:
+            elapsed = time.perf_counter() - start
+            if hedge_at is not None and (elapsed >= hedge_at or not pending):
+                hedge_at = None
+                record_event("gemini", "hedged")
+                pending.add(asyncio.ensure_future(attempt()))
+            if not pending or elapsed >= deadline:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=(deadline if hedge_at is None else hedge_at) - elapsed, return_when=FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    _gemini_breaker.record(time.perf_counter() - min(sent))
+                    if task is not primary:
+                        record_event("gemini", "hedge_won")
+                    return task.result()
+                error = task.exception()
+                if not _transient(error):
+                    raise error
+    finally:
+        for task in pending:
+            task.cancel()
+    
+    if sent:
+        _gemini_breaker.record(time.perf_counter() - min(sent), ok=False)
+    if pending:
+        record_event("gemini", "deadline")
+        raise TimeoutError(f"request timed out after {deadline:g}s")
+    raise error
+
+def _generate(build_request, cache_slot=None, *, deadline):
+    """Run a blocking request within deadline seconds, consulting the in-memory cache_slot and the disk cache.
+    
+    If Gemini fails, times out or is cut off by the breaker, an expired disk
+    cache entry for the same request is returned instead of raising.
+    """
+    if cache_slot:
+        lookup, store = cache_slot
+        cached = lookup()
+        if cached is not None:
+            return cached
+    
+    model, contents = build_request()
+    key = _request_key(model, contents)
+    disk_lookup, disk_store = _response_cache_slot(key)
+    text = disk_lookup()
+    if text is None:
+        def fetch():
+            result = _call_bounded(model, contents, deadline)
+            disk_store(result)
+            return result
+        try:
+            text = _gemini_flight.do(key, fetch)
+        except Exception:
+            text = _stale_lookup(key)
+            if text is None:
+                raise
+            return text
+    
+    if cache_slot:
+        store(text)
+    return text
+
+async def _generate_async(build_request, cache_slot=None, *, deadline):
+    """Async counterpart of _generate built on generate_content_async"""
+    if cache_slot:
+        lookup, store = cache_slot
+        cached = lookup()
+        if cached is not None:
+            return cached
+    
+    model, contents = build_request()
+    key = _request_key(model, contents)
+    disk_lookup, disk_store = _response_cache_slot(key)
+    # SQLite reads and writes block, so they run off the event loop
+    text = await asyncio.to_thread(disk_lookup)
+    if text is None:
+        async def fetch():
+            result = await _call_bounded_async(model, contents, deadline)
+            await asyncio.to_thread(disk_store, result)
+            return result
+        try:
+            text = await _gemini_flight.do_async(key, fetch)
+        except Exception:
+            text = await asyncio.to_thread(_stale_lookup, key)
+            if text is None:
+                raise
+            return text
+    
+    if cache_slot:
+        store(text)
+    return text
+
+async def _run_async(coro, timeout, error_prefix):
+    """Await coro under an optional deadline, mapping failures to a readable error string.
+    
+    Cancellation is not caught, so callers can still cancel the task.
+    """
+    try:
+        return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError as e:
+        record_error("TimeoutError")
+        # The per-call deadline names itself; wait_for's own timeout carries no message
+        return f"{error_prefix}: {str(e) or f'request timed out after {timeout}s'}"
+    except Exception as e:
+        record_error(e)
+        return f"{error_prefix}: {str(e)}"
+
+def _stream_text(model, contents, estimate=None):
+    """Yield text chunks from a streaming generate_content call"""
+    if estimate is None:
+        estimate = _reserve(contents)
+    start = time.perf_counter()
+    received = 0
+    try:
+        response = model.generate_content(contents, stream=True)
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunk carries no text parts (e.g. finish reason or safety block)
+                continue
+            if text:
+                received += len(text.encode("utf-8"))
+                yield text
+    except Exception as e:
+        record_upstream("gemini", time.perf_counter() - start, type(e).__name__)
+        raise
+    record_upstream("gemini", time.perf_counter() - start, "ok")
+    record_bytes("gemini", "upload", _upload_bytes(contents))
+    record_bytes("gemini", "download", received)
+    _settle_tokens(response, estimate)
+
+_STREAM_END = object()
+
+def _stream_bounded(model, contents, deadline):
+    """_stream_text behind the circuit breaker, never waiting more than deadline seconds for a chunk.
+    
+    The blocking SDK iterator runs on the call pool; it stops early once the
+    caller gives up or closes the stream, and never starts if that happened
+    while it was queued. As in _call_bounded, quota is reserved before the
+    clock starts and the breaker only sees time spent on Gemini.
+    """
+    _admit()
+    estimate = _reserve(contents)
+    chunks = queue.Queue()
+    stop = threading.Event()
+    sent = []
+    
+    def produce():
+        if stop.is_set():
+            _refund(estimate)
+            return
+        sent.append(time.perf_counter())
+        stream = _stream_text(model, contents, estimate)
+        try:
+            for text in stream:
+                if stop.is_set():
+                    return
+                chunks.put((text, None))
+            chunks.put((_STREAM_END, None))
+        except Exception as e:
+            chunks.put((None, e))
+        finally:
+            stream.close()
+    
+    first_chunk = None
+    _gemini_calls.submit(propagate(produce))
+    try:
+        while True:
+            try:
+                text, error = chunks.get(timeout=deadline)
+            except queue.Empty:
+                record_event("gemini", "deadline")
+                raise TimeoutError(f"request timed out after {deadline:g}s")
+            if error is not None:
+                raise error
+            if text is _STREAM_END:
+                break
+            if first_chunk is None:
+                first_chunk = time.perf_counter()
+            yield text
+    except Exception as e:
+        if _transient(e) and sent:
+            _gemini_breaker.record(time.perf_counter() - sent[0], ok=False)
+        raise
+    else:
+        # Streams are judged on time to first chunk; long answers legitimately take a while
+        _gemini_breaker.record((first_chunk if first_chunk is not None else time.perf_counter()) - sent[0])
+    finally:
+        stop.set()
+
+def _stream_with_error(build_request, error_prefix, cache_slot=None, *, deadline, failures=None):
+    """Stream a request built lazily, yielding a readable error on failure.
+    
+    A stream that fails before its first chunk falls back to an expired disk
+    cache entry for the same request, if there is one. Otherwise the error is
+    also appended to the optional failures list, since it may follow partial
+    text the caller cannot tell apart from an answer.
+    """
+    key = None
+    parts = []
+    try:
+        if cache_slot:
+            lookup, store = cache_slot
+            cached = lookup()
+            if cached is not None:
+                yield cached
+                return
         
+        model, contents = build_request()
+        key = _request_key(model, contents)
+        disk_lookup, disk_store = _response_cache_slot(key)
+        cached = disk_lookup()
+        if cached is not None:
+            if cache_slot:
+                store(cached)
+            yield cached
+            return
         
-        if isinstance(image, bytes):
-            image = Image.open(io.BytesIO(image))
-        elif not isinstance(image, Image.Image):
-            image = Image.open(image)
+        for text in _stream_bounded(model, contents, deadline):
+            parts.append(text)
+            yield text
         
-        prompt = f"""
+        # Only complete answers are cached; every chunk may have been skipped (e.g. a safety block)
+        text = "".join(parts)
+        if not text:
+            raise ValueError("Gemini returned no text; the answer may have been blocked")
+        disk_store(text)
+        if cache_slot:
+            store(text)
+    except Exception as e:
+        stale = _stale_lookup(key) if key is not None and not parts else None
+        if stale is not None:
+            yield stale
+            return
+        record_error(e)
+        if failures is not None:
+            failures.append(e)
+        yield f"{error_prefix}: {str(e)}"
+
+def _crop_disease_request(image, crop_name=""):
+    prompt = f"""
         Analyze this agricultural image and provide:
         1. Identify any crop disease or pest infestation visible
         2. Describe the symptoms clearly
@@ -33,28 +715,85 @@ def analyze_crop_disease(image, crop_name=""):
         
         Respond in simple, accessible language suitable for small-scale Indian farmers.
         """
-        
-        response = model.generate_content([prompt, image])
-        return response.text
-    except Exception as e:
-        return f"Error analyzing image: {str(e)}"
+    
+    return get_model(GEMINI_VISION_MODEL), [prompt, _image_blob(image)]
 
-def analyze_soil_quality(image=None, description=""):
-    """Analyze soil quality from image or description"""
+@instrument
+def analyze_crop_disease(image, crop_name=""):
+    """Analyze crop disease from image using Gemini Vision"""
     try:
         if not GEMINI_API_KEY:
             return "GEMINI_API_KEY missing"
         
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        if image:
-            vision_model = genai.GenerativeModel('gemini-2.5-flash')
-            if isinstance(image, bytes):
-                image = Image.open(io.BytesIO(image))
-            elif not isinstance(image, Image.Image):
-                image = Image.open(image)
-            
-            prompt = """
+        image = preprocess_image(image)
+        return _generate(
+            lambda: _crop_disease_request(image, crop_name),
+            _image_cache_slot("disease", image, crop_name),
+            deadline=GEMINI_TIMEOUT_VISION
+        )
+    except Exception as e:
+        record_error(e)
+        return f"Error analyzing image: {str(e)}"
+
+@instrument
+def analyze_crop_disease_stream(image, crop_name=""):
+    """Streaming variant of analyze_crop_disease that yields text chunks"""
+    if not GEMINI_API_KEY:
+        yield "GEMINI_API_KEY missing"
+        return
+    try:
+        image = preprocess_image(image)
+    except Exception as e:
+        record_error(e)
+        yield f"Error analyzing image: {str(e)}"
+        return
+    yield from _stream_with_error(
+        lambda: _crop_disease_request(image, crop_name),
+        "Error analyzing image",
+        _image_cache_slot("disease", image, crop_name),
+        deadline=GEMINI_TIMEOUT_VISION
+    )
+
+async def _analyze_crop_disease_async(image, crop_name):
+    # Decoding and resizing are CPU-bound, so keep them off the event loop
+    image = await asyncio.to_thread(preprocess_image, image)
+    return await _generate_async(
+        lambda: _crop_disease_request(image, crop_name),
+        _image_cache_slot("disease", image, crop_name),
+        deadline=GEMINI_TIMEOUT_VISION
+    )
+
+@instrument
+async def analyze_crop_disease_async(image, crop_name="", timeout=None):
+    """Async counterpart of analyze_crop_disease with an optional deadline in seconds"""
+    if not GEMINI_API_KEY:
+        return "GEMINI_API_KEY missing"
+    return await _run_async(
+        _analyze_crop_disease_async(image, crop_name), timeout, "Error analyzing image"
+    )
+
+@instrument
+def analyze_crop_disease_batch(images, crop_name="", max_workers=GEMINI_BATCH_CONCURRENCY):
+    """Analyze many images concurrently, yielding (index, result) as each one completes.
+    
+    At most max_workers requests are in flight, and all of them share the
+    process-wide Gemini rate limiter.
+    """
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        futures = {
+            executor.submit(analyze_crop_disease, image, crop_name): index
+            for index, image in enumerate(images)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # Drop queued work if the caller stops consuming results early
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _soil_quality_request(image=None, description=""):
+    if image:
+        prompt = """
             Analyze this soil image and provide:
             1. Visual assessment of soil texture and color
             2. Likely soil type (sandy, clayey, loamy)
@@ -64,10 +803,9 @@ def analyze_soil_quality(image=None, description=""):
 
             Respond in simple Hindi/English mixed language for Indian farmers.
             """
-            response = vision_model.generate_content([prompt, image])
-            return response.text
-        else:
-            prompt = f"""
+        return get_model(GEMINI_VISION_MODEL), [prompt, _image_blob(image)]
+    
+    prompt = f"""
             Based on this soil description: "{description}"
             Provide:
             1. Soil type assessment
@@ -78,20 +816,69 @@ def analyze_soil_quality(image=None, description=""):
             
             Respond in simple Hindi/English mixed language for Indian farmers.
             """
-            response = model.generate_content(prompt)
-            return response.text
-    except Exception as e:
-        return f"Error analyzing soil: {str(e)}"
+    return get_model(), prompt
 
-def get_crop_recommendations(region, soil_type, preferences=""):
-    """Get AI-powered crop diversification recommendations"""
+def _soil_deadline(image):
+    return GEMINI_TIMEOUT_VISION if image else GEMINI_TIMEOUT_RECOMMENDATIONS
+
+@instrument
+def analyze_soil_quality(image=None, description=""):
+    """Analyze soil quality from image or description"""
     try:
         if not GEMINI_API_KEY:
-            return "Please set your GEMINI_API_KEY in the .env file"
-        
-        model = genai.GenerativeModel('gemini-2.5-flash')
+            return "GEMINI_API_KEY missing"
         
-        prompt = f"""
+        cache_slot = None
+        if image:
+            image = preprocess_image(image)
+            cache_slot = _image_cache_slot("soil", image)
+        return _generate(
+            lambda: _soil_quality_request(image, description), cache_slot, deadline=_soil_deadline(image)
+        )
+    except Exception as e:
+        record_error(e)
+        return f"Error analyzing soil: {str(e)}"
+
+@instrument
+def analyze_soil_quality_stream(image=None, description=""):
+    """Streaming variant of analyze_soil_quality that yields text chunks"""
+    if not GEMINI_API_KEY:
+        yield "GEMINI_API_KEY missing"
+        return
+    cache_slot = None
+    if image:
+        try:
+            image = preprocess_image(image)
+        except Exception as e:
+            record_error(e)
+            yield f"Error analyzing soil: {str(e)}"
+            return
+        cache_slot = _image_cache_slot("soil", image)
+    yield from _stream_with_error(
+        lambda: _soil_quality_request(image, description), "Error analyzing soil", cache_slot,
+        deadline=_soil_deadline(image)
+    )
+
+async def _analyze_soil_quality_async(image, description):
+    cache_slot = None
+    if image:
+        image = await asyncio.to_thread(preprocess_image, image)
+        cache_slot = _image_cache_slot("soil", image)
+    return await _generate_async(
+        lambda: _soil_quality_request(image, description), cache_slot, deadline=_soil_deadline(image)
+    )
+
+@instrument
+async def analyze_soil_quality_async(image=None, description="", timeout=None):
+    """Async counterpart of analyze_soil_quality with an optional deadline in seconds"""
+    if not GEMINI_API_KEY:
+        return "GEMINI_API_KEY missing"
+    return await _run_async(
+        _analyze_soil_quality_async(image, description), timeout, "Error analyzing soil"
+    )
+
+def _crop_recommendations_request(region, soil_type, preferences=""):
+    prompt = f"""
         As an agricultural expert for Indian farmers, provide crop diversification recommendations:
         
         Region: {region}
@@ -108,40 +895,69 @@ def get_crop_recommendations(region, soil_type, preferences=""):
         
         Respond in simple Hindi/English mixed language for small-scale farmers.
         """
-        
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        return f"Error getting recommendations: {str(e)}"
+    
+    return get_model(), prompt
 
-def get_crop_specific_weather_recommendations(crop_name, weather_data):
-    """Get AI-powered crop-specific weather recommendations"""
+@instrument
+def generate_crop_recommendations(region, soil_type, preferences=""):
+    """Like get_crop_recommendations, but raises on failure instead of returning an error string"""
+    return _generate(
+        lambda: _crop_recommendations_request(region, soil_type, preferences), deadline=GEMINI_TIMEOUT_RECOMMENDATIONS
+    )
+
+@instrument
+def get_crop_recommendations(region, soil_type, preferences=""):
+    """Get AI-powered crop diversification recommendations"""
     try:
         if not GEMINI_API_KEY:
             return "Please set your GEMINI_API_KEY in the .env file"
         
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        
-        temp = weather_data.get("main", {}).get("temp", 0)
-        humidity = weather_data.get("main", {}).get("humidity", 0)
-        pressure = weather_data.get("main", {}).get("pressure", 0)
-        temp_min = weather_data.get("main", {}).get("temp_min", 0)
-        temp_max = weather_data.get("main", {}).get("temp_max", 0)
-        rainfall = weather_data.get("rain", {}).get("1h", 0) if weather_data.get("rain") else 0
-        wind_speed = weather_data.get("wind", {}).get("speed", 0)
-        weather_desc = weather_data.get("weather", [{}])[0].get("description", "")
-        
-        prompt = f"""
+        # Not generate_crop_recommendations: its @instrument would count this failure a second time
+        return _generate(
+            lambda: _crop_recommendations_request(region, soil_type, preferences), deadline=GEMINI_TIMEOUT_RECOMMENDATIONS
+        )
+    except Exception as e:
+        record_error(e)
+        return f"Error getting recommendations: {str(e)}"
+
+@instrument
+def get_crop_recommendations_stream(region, soil_type, preferences=""):
+    """Streaming variant of get_crop_recommendations that yields text chunks"""
+    if not GEMINI_API_KEY:
+        yield "Please set your GEMINI_API_KEY in the .env file"
+        return
+    yield from _stream_with_error(
+        lambda: _crop_recommendations_request(region, soil_type, preferences),
+        "Error getting recommendations",
+        deadline=GEMINI_TIMEOUT_RECOMMENDATIONS
+    )
+
+@instrument
+async def get_crop_recommendations_async(region, soil_type, preferences="", timeout=None):
+    """Async counterpart of get_crop_recommendations with an optional deadline in seconds"""
+    if not GEMINI_API_KEY:
+        return "Please set your GEMINI_API_KEY in the .env file"
+    return await _run_async(
+        _generate_async(
+            lambda: _crop_recommendations_request(region, soil_type, preferences),
+            deadline=GEMINI_TIMEOUT_RECOMMENDATIONS
+        ),
+        timeout,
+        "Error getting recommendations"
+    )
+
+def _crop_weather_request(crop_name, bands):
+    conditions = describe_bands(bands)
+    
+    prompt = f"""
         As an agricultural expert for Indian farmers, provide specific weather-based recommendations for {crop_name} crop.
         
         Current Weather Conditions:
-        - Temperature: {temp}°C (Range: {temp_min}°C to {temp_max}°C)
-        - Humidity: {humidity}%
-        - Atmospheric Pressure: {pressure} hPa
-        - Weather Description: {weather_desc}
-        - Wind Speed: {wind_speed} m/s
-        - Recent Rainfall: {rainfall} mm (if applicable)
+        - Temperature: {conditions["temperature"]}
+        - Humidity: {conditions["humidity"]}
+        - Sky: {conditions["sky"]}
+        - Wind: {conditions["wind"]}
+        - Recent Rainfall: {conditions["rain"]}
         
         Provide SPECIFIC recommendations for {crop_name}:
         1. Is current temperature suitable for this crop? If not, what actions to take?
@@ -156,31 +972,191 @@ def get_crop_specific_weather_recommendations(crop_name, weather_data):
         Respond in simple Hindi/English mixed language suitable for small-scale Indian farmers.
         Format as clear, actionable bullet points.
         """
-        
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        return f"Error generating recommendations: {str(e)}"
+    
+    return get_model(), prompt
 
-def chat_with_ai(question):
-    """Conversational AI for farmer queries"""
+def _weather_advice_cache_slot(crop_name, bands):
+    """Return (lookup, store) callables for the weather-band advice cache"""
+    key = (crop_name.strip().lower(), bands, PROMPT_VERSION)
+    with _weather_bands_lock:
+        _weather_bands_seen.add(bands)
+    return (
+        lambda: _weather_advice.get(key),
+        lambda text: _weather_advice.set(key, text)
+    )
+
+def get_weather_advice_cache_stats():
+    """Return hit ratio and distinct weather bands seen by the advice cache"""
+    stats = _weather_advice.stats()
+    with _weather_bands_lock:
+        stats["distinct_bands"] = len(_weather_bands_seen)
+    return stats
+
+def clear_gemini_caches():
+    """Drop cached analyses and advice from memory and from the on-disk response cache"""
+    _image_results.clear()
+    _weather_advice.clear()
+    with _weather_bands_lock:
+        _weather_bands_seen.clear()
+    cache = get_response_cache()
+    if cache is not None:
+        cache.clear()
+
+def _collect_metrics():
+    yield from cache_gauges("gemini_image_results", _image_results.stats())
+    yield from cache_gauges("gemini_weather_advice", _weather_advice.stats())
+    # Only report the disk cache once something opened it; stats() is a table scan
+    if _response_cache:
+        yield from cache_gauges("gemini_response_cache", _response_cache.stats())
+    yield from limiter_gauges("gemini_requests", _gemini_limiter.stats())
+    yield from limiter_gauges("gemini_tokens", _gemini_token_limiter.stats())
+    yield from single_flight_gauges("gemini", _gemini_flight.stats())
+    yield from breaker_gauges("gemini", _gemini_breaker.stats())
+
+register_collector(_collect_metrics)
+
+@instrument
+def get_crop_specific_weather_recommendations(crop_name, weather_data):
+    """Get AI-powered crop-specific weather recommendations.
+    
+    Weather is quantized into bands first, so nearby locations with
+    practically identical conditions share one cached answer.
+    """
     try:
         if not GEMINI_API_KEY:
             return "Please set your GEMINI_API_KEY in the .env file"
         
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        system_prompt = """
+        bands = quantize_weather(weather_data)
+        return _generate(
+            lambda: _crop_weather_request(crop_name, bands),
+            _weather_advice_cache_slot(crop_name, bands),
+            deadline=GEMINI_TIMEOUT_WEATHER
+        )
+    except Exception as e:
+        record_error(e)
+        return f"Error generating recommendations: {str(e)}"
+
+@instrument
+def get_crop_specific_weather_recommendations_stream(crop_name, weather_data):
+    """Streaming variant of get_crop_specific_weather_recommendations"""
+    if not GEMINI_API_KEY:
+        yield "Please set your GEMINI_API_KEY in the .env file"
+        return
+    try:
+        bands = quantize_weather(weather_data)
+    except Exception as e:
+        record_error(e)
+        yield f"Error generating recommendations: {str(e)}"
+        return
+    yield from _stream_with_error(
+        lambda: _crop_weather_request(crop_name, bands),
+        "Error generating recommendations",
+        _weather_advice_cache_slot(crop_name, bands),
+        deadline=GEMINI_TIMEOUT_WEATHER
+    )
+
+@instrument
+async def get_crop_specific_weather_recommendations_async(crop_name, weather_data, timeout=None):
+    """Async counterpart of get_crop_specific_weather_recommendations"""
+    if not GEMINI_API_KEY:
+        return "Please set your GEMINI_API_KEY in the .env file"
+    try:
+        bands = quantize_weather(weather_data)
+    except Exception as e:
+        record_error(e)
+        return f"Error generating recommendations: {str(e)}"
+    return await _run_async(
+        _generate_async(
+            lambda: _crop_weather_request(crop_name, bands),
+            _weather_advice_cache_slot(crop_name, bands),
+            deadline=GEMINI_TIMEOUT_WEATHER
+        ),
+        timeout,
+        "Error generating recommendations"
+    )
+
+CHAT_SYSTEM_PROMPT = """
         You are a helpful agricultural assistant for Indian farmers. 
         Provide clear, practical advice in simple Hindi/English mixed language.
         Focus on small-scale farming practices, affordable solutions, and local Indian context.
         Be empathetic and supportive.
         """
+
+def _chat_request(question, conversation=None):
+    """Single-prompt request; earlier turns come from the bounded conversation, if any"""
+    history = ""
+    if conversation is not None:
+        history = conversation.transcript(question, reserve=len(CHAT_SYSTEM_PROMPT) // 4)
+    if history:
+        prompt = (
+            f"{CHAT_SYSTEM_PROMPT}\n\n{history}\n\n"
+            f"Farmer's Question: {question}\n\n"
+            "Answer the new question, using the conversation above for context:"
+        )
+    else:
+        prompt = f"{CHAT_SYSTEM_PROMPT}\n\nFarmer's Question: {question}\n\nProvide a helpful answer:"
+    
+    return get_model(), prompt
+
+@instrument
+def summarize_conversation(summary, turns):
+    """Fold earlier chat turns into the rolling summary; raises on failure"""
+    if not GEMINI_API_KEY:
+        raise RuntimeError("GEMINI_API_KEY is not set")
+    
+    transcript = "\n".join(f"Farmer: {question}\nAssistant: {answer}" for question, answer in turns)
+    prompt = f"""
+        Update the running summary of a conversation between a farmer and an agricultural assistant.
+        Keep the facts that later questions may depend on: crops, location, season, soil,
+        problems described and advice already given. At most 120 words, plain sentences.
+        
+        Current summary:
+        {summary or "(none)"}
         
-        prompt = f"{system_prompt}\n\nFarmer's Question: {question}\n\nProvide a helpful answer:"
+        New exchanges:
+        {transcript}
         
-        response = model.generate_content(prompt)
-        return response.text
+        Updated summary:
+        """
+    return _generate(lambda: (get_model(), prompt), deadline=GEMINI_TIMEOUT_SUMMARY)
+
+@instrument
+def chat_with_ai(question, conversation=None):
+    """Conversational AI for farmer queries.
+    
+    Pass a Conversation to answer in context; the caller records the answer
+    with conversation.add(question, answer, summarize_conversation).
+    """
+    try:
+        if not GEMINI_API_KEY:
+            return "Please set your GEMINI_API_KEY in the .env file"
+        
+        return _generate(lambda: _chat_request(question, conversation), deadline=GEMINI_TIMEOUT_CHAT)
     except Exception as e:
+        record_error(e)
         return f"Error: {str(e)}"
 
+@instrument
+def chat_with_ai_stream(question, conversation=None, failures=None):
+    """Streaming variant of chat_with_ai that yields text chunks.
+    
+    If the answer fails, the exception is appended to the optional failures
+    list; the stream still ends with a readable error.
+    """
+    if not GEMINI_API_KEY:
+        if failures is not None:
+            failures.append(RuntimeError("GEMINI_API_KEY is not set"))
+        yield "Please set your GEMINI_API_KEY in the .env file"
+        return
+    yield from _stream_with_error(
+        lambda: _chat_request(question, conversation), "Error", deadline=GEMINI_TIMEOUT_CHAT, failures=failures
+    )
+
+@instrument
+async def chat_with_ai_async(question, timeout=None, conversation=None):
+    """Async counterpart of chat_with_ai with an optional deadline in seconds"""
+    if not GEMINI_API_KEY:
+        return "Please set your GEMINI_API_KEY in the .env file"
+    return await _run_async(
+        _generate_async(lambda: _chat_request(question, conversation), deadline=GEMINI_TIMEOUT_CHAT), timeout, "Error"
+    )
@@ -0,0 +1,122 @@
+import threading
+from collections import OrderedDict
+
+
+HASH_BITS = 64
+
+def dhash(image, size=8):
+    """64-bit difference hash: compares neighbouring pixels of a tiny grayscale thumbnail"""
+    # Imported on first use so the cache itself loads without NumPy and Pillow
+    import numpy as np
+    from PIL import Image
+    
+    gray = image.convert("L").resize((size + 1, size), Image.BOX)
+    pixels = np.asarray(gray, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class ImageResultCache:
+    """LRU cache of analysis results keyed on perceptual hash, with near-duplicate lookup.
+
+    Lookups use multi-index hashing: each hash is split into threshold + 1
+    disjoint chunks, and any stored hash within `threshold` bits of the query
+    must match it exactly on at least one chunk (pigeonhole). Candidates are
+    gathered from one dict lookup per chunk, so lookup cost stays sub-linear as
+    the cache grows, and eviction is a constant-time bucket removal.
+    """
+
+    def __init__(self, maxsize=10000, threshold=6):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        chunks = threshold + 1
+        edges = [round(i * HASH_BITS / chunks) for i in range(chunks + 1)]
+        self._chunks = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(edges, edges[1:])]
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def _bucket_keys(self, namespace, image_hash):
+        for index, (shift, mask) in enumerate(self._chunks):
+            yield namespace, index, (image_hash >> shift) & mask
+
+    def _find(self, namespace, image_hash):
+        if (namespace, image_hash) in self._entries:
+            return image_hash, 0
+
+        best, best_distance = None, self.threshold + 1
+        seen = set()
+        for bucket_key in self._bucket_keys(namespace, image_hash):
+            for candidate in self._buckets.get(bucket_key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = hamming(candidate, image_hash)
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+        return best, best_distance
+
+    def get(self, namespace, image_hash, default=None):
+        """Return the result stored for the closest hash within threshold, if any"""
+        with self._lock:
+            match, distance = self._find(namespace, image_hash)
+            if match is None:
+                self.misses += 1
+                return default
+
+            key = (namespace, match)
+            self._entries.move_to_end(key)
+            if distance == 0:
+                self.exact_hits += 1
+            else:
+                self.near_hits += 1
+            return self._entries[key]
+
+    def set(self, namespace, image_hash, value):
+        if self.maxsize <= 0:
+            return
+        key = (namespace, image_hash)
+        with self._lock:
+            if key not in self._entries:
+                for bucket_key in self._bucket_keys(namespace, image_hash):
+                    self._buckets.setdefault(bucket_key, set()).add(image_hash)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                (old_namespace, old_hash), _ = self._entries.popitem(last=False)
+                for bucket_key in self._bucket_keys(old_namespace, old_hash):
+                    bucket = self._buckets.get(bucket_key)
+                    if bucket is not None:
+                        bucket.discard(old_hash)
+                        if not bucket:
+                            del self._buckets[bucket_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self.exact_hits = self.near_hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            hits = self.exact_hits + self.near_hits
+            lookups = hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,350 @@
+import bisect
+import contextvars
+import functools
+import inspect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+PREFIX = "krishi_"
+
+# Seconds; covers cache hits (sub-millisecond) through slow LLM calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Name of the instrumented helper the current call runs under
+_current_helper = contextvars.ContextVar("krishi_helper", default="")
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and three increments"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (inf if above the last bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Registry:
+    """Counters and histograms keyed by (name, labels), plus gauges read from collectors at export time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def register_collector(self, collect):
+        """collect() yields (name, labels, value) gauges; it runs only when metrics are exported"""
+        with self._lock:
+            self._collectors.append(collect)
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _gauges(self):
+        with self._lock:
+            collectors = list(self._collectors)
+        gauges = []
+        for collect in collectors:
+            try:
+                gauges.extend(collect())
+            except Exception:
+                # A broken collector must not take the metrics endpoint down
+                continue
+        return gauges
+
+    def _copy(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: (h.buckets, list(h.counts), h.sum, h.count) for key, h in self._histograms.items()
+            }
+        return counters, histograms
+
+    def snapshot(self):
+        """JSON-serializable view of every metric"""
+        counters, histograms = self._copy()
+        result = {"counters": [], "histograms": [], "gauges": []}
+        for (name, labels), value in sorted(counters.items()):
+            result["counters"].append({"name": PREFIX + name, "labels": dict(labels), "value": value})
+        for (name, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+            histogram = Histogram(buckets)
+            histogram.counts, histogram.sum, histogram.count = counts, total, count
+            result["histograms"].append({
+                "name": PREFIX + name,
+                "labels": dict(labels),
+                "count": count,
+                "sum": total,
+                "mean": total / count if count else None,
+                "p50": histogram.quantile(0.50),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99),
+                "buckets": dict(zip([str(b) for b in buckets] + ["+Inf"], counts))
+            })
+        for name, labels, value in self._gauges():
+            result["gauges"].append({"name": PREFIX + name, "labels": dict(labels), "value": value})
+        return result
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        counters, histograms = self._copy()
+        lines = []
+        typed = set()
+
+        def declare(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            declare(PREFIX + name, "counter")
+            lines.append(f"{PREFIX}{name}{_format_labels(labels)} {value}")
+        for (name, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+            declare(PREFIX + name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ["+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {count}")
+        for name, labels, value in sorted(self._gauges(), key=lambda g: (g[0], g[1])):
+            declare(PREFIX + name, "gauge")
+            lines.append(f"{PREFIX}{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+REGISTRY = Registry()
+
+
+def current_helper():
+    return _current_helper.get()
+
+def record_error(error):
+    """Count an error by type under the current helper; accepts an exception or a type name"""
+    kind = error if isinstance(error, str) else type(error).__name__
+    REGISTRY.inc("errors_total", (("helper", _current_helper.get()), ("type", kind)))
+
+def record_upstream(upstream, seconds, outcome):
+    """One upstream request: latency and outcome (HTTP status or exception type)"""
+    helper = _current_helper.get()
+    REGISTRY.observe("upstream_latency_seconds", (("upstream", upstream), ("helper", helper)), seconds)
+    REGISTRY.inc("upstream_requests_total", (("upstream", upstream), ("helper", helper), ("outcome", str(outcome))))
+
+def record_tokens(prompt_tokens, output_tokens):
+    helper = _current_helper.get()
+    if prompt_tokens:
+        REGISTRY.inc("gemini_tokens_total", (("helper", helper), ("kind", "prompt")), prompt_tokens)
+    if output_tokens:
+        REGISTRY.inc("gemini_tokens_total", (("helper", helper), ("kind", "output")), output_tokens)
+
+def record_bytes(upstream, direction, count):
+    """Payload bytes sent ("upload") to or received ("download") from an upstream"""
+    if count:
+        REGISTRY.inc(
+            "upstream_bytes_total",
+            (("upstream", upstream), ("helper", _current_helper.get()), ("direction", direction)),
+            count
+        )
+
+def record_event(upstream, event):
+    """Count a resilience event for an upstream: hedged, hedge_won, deadline, rejected, stale, fallback"""
+    REGISTRY.inc("upstream_events_total", (("upstream", upstream), ("helper", _current_helper.get()), ("event", event)))
+
+def register_collector(collect):
+    REGISTRY.register_collector(collect)
+
+def cache_gauges(cache, stats):
+    """Gauges for a cache stats() dict (TTLCache, ImageResultCache or ResponseCache)"""
+    labels = (("cache", cache),)
+    hits = stats.get("hits", stats.get("exact_hits", 0) + stats.get("near_hits", 0))
+    yield "cache_hits", labels, hits
+    yield "cache_misses", labels, stats.get("misses", 0)
+    yield "cache_entries", labels, stats.get("size", stats.get("entries", 0))
+    yield "cache_hit_ratio", labels, stats.get("hit_ratio", 0.0)
+    if "evictions" in stats:
+        yield "cache_evictions", labels, stats["evictions"]
+
+def limiter_gauges(limiter, stats):
+    """Gauges for a RateLimiter stats() dict"""
+    labels = (("limiter", limiter),)
+    yield "rate_limit_queue_depth", labels, stats["queue_depth"]
+    yield "rate_limit_delayed", labels, stats["delayed"]
+    yield "rate_limit_wait_seconds_max", labels, stats["max_wait_s"]
+
+def single_flight_gauges(name, stats):
+    """Gauges for a SingleFlight stats() dict"""
+    labels = (("flight", name),)
+    yield "single_flight_calls", labels, stats["calls"]
+    yield "single_flight_coalesced", labels, stats["coalesced"]
+    yield "single_flight_in_flight", labels, stats["in_flight"]
+
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+def breaker_gauges(name, stats):
+    """Gauges for a CircuitBreaker stats() dict; state is 0 closed, 1 half-open, 2 open"""
+    labels = (("breaker", name),)
+    yield "circuit_breaker_state", labels, BREAKER_STATES[stats["state"]]
+    yield "circuit_breaker_opened", labels, stats["opened"]
+    yield "circuit_breaker_rejected", labels, stats["rejected"]
+    yield "circuit_breaker_slo_breaches", labels, stats["slo_breaches"]
+
+
+def _finish(labels, start):
+    REGISTRY.observe("helper_latency_seconds", labels, time.perf_counter() - start)
+
+def instrument(fn):
+    """Record latency and raised errors for a helper, and label nested upstream calls with its name.
+
+    Works for plain functions, coroutines and generators (streams also get a
+    time-to-first-chunk histogram).
+    """
+    name = fn.__name__
+    labels = (("helper", name),)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            token = _current_helper.set(name)
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                record_error(e)
+                raise
+            finally:
+                _finish(labels, start)
+                _current_helper.reset(token)
+        return wrapper
+
+    if inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            first = True
+            chunks = fn(*args, **kwargs)
+            try:
+                while True:
+                    # Set the label around each step only, so it never leaks to the consumer
+                    token = _current_helper.set(name)
+                    try:
+                        chunk = next(chunks)
+                    except StopIteration:
+                        return
+                    except Exception as e:
+                        record_error(e)
+                        raise
+                    finally:
+                        _current_helper.reset(token)
+                    if first:
+                        first = False
+                        REGISTRY.observe("helper_first_chunk_seconds", labels, time.perf_counter() - start)
+                    yield chunk
+            finally:
+                chunks.close()
+                _finish(labels, start)
+        return wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current_helper.set(name)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            record_error(e)
+            raise
+        finally:
+            _finish(labels, start)
+            _current_helper.reset(token)
+    return wrapper
+
+def propagate(fn):
+    """Wrap fn to run in a copy of the caller's context, so worker threads keep the helper label"""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+
+def render_prometheus():
+    return REGISTRY.render_prometheus()
+
+def snapshot():
+    return REGISTRY.snapshot()
+
+def write_json(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics":
+            body = render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path.split("?")[0] == "/metrics.json":
+            body = json.dumps(snapshot()).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port, host="0.0.0.0"):
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread; returns the server"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket that queues callers instead of failing them.
+
+    Allows `rate_per_minute` units per minute with bursts up to `burst`. The
+    unit is whatever callers pass to acquire(): requests, or tokens for a
+    tokens-per-minute quota. Queue depth and wait times are tracked for stats().
+    """
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, rate_per_minute // 10))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.delayed = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_take(self, amount):
+        """Take tokens if available; otherwise return how long to wait before retrying"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate
+
+    def _enqueue(self):
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+        return time.monotonic()
+
+    def _record(self, started):
+        with self._lock:
+            self.acquired += 1
+            if started is not None:
+                waited = time.monotonic() - started
+                self.waiting -= 1
+                self.delayed += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+    def acquire(self, amount=1):
+        """Wait until `amount` tokens are available, then take them"""
+        if self.rate <= 0:
+            return
+        # A request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        started = None
+        try:
+            while True:
+                wait = self._try_take(amount)
+                if not wait:
+                    return
+                if started is None:
+                    started = self._enqueue()
+                time.sleep(wait)
+        finally:
+            self._record(started)
+
+    async def acquire_async(self, amount=1):
+        """Like acquire, but yields to the event loop while waiting"""
+        if self.rate <= 0:
+            return
+        amount = min(amount, self.capacity)
+        started = None
+        try:
+            while True:
+                wait = self._try_take(amount)
+                if not wait:
+                    return
+                if started is None:
+                    started = self._enqueue()
+                await asyncio.sleep(wait)
+        finally:
+            self._record(started)
+
+    def adjust(self, amount):
+        """Charge (or refund, if negative) tokens after the fact, e.g. once real usage is known"""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate_per_minute": self.rate * 60,
+                "acquired": self.acquired,
+                "delayed": self.delayed,
+                "queue_depth": self.waiting,
+                "max_queue_depth": self.max_waiting,
+                "avg_wait_s": self.total_wait / self.delayed if self.delayed else 0.0,
+                "max_wait_s": self.max_wait,
+            }
@@ -0,0 +1,77 @@
+import os
+import time
+import zlib
+
+try:
+    from utils.sqlite_store import SQLiteStore
+except ImportError:
+    from sqlite_store import SQLiteStore
+
+
+def _key(state, soil_type, district=""):
+    return (
+        " ".join(state.split()).lower(),
+        " ".join(soil_type.split()).lower(),
+        " ".join((district or "").split()).lower()
+    )
+
+
+class RecommendationStore(SQLiteStore):
+    """SQLite-backed store of precomputed crop diversification recommendations"""
+
+    SCHEMA = ("""
+        CREATE TABLE IF NOT EXISTS recommendations (
+            state TEXT NOT NULL,
+            soil_type TEXT NOT NULL,
+            district TEXT NOT NULL,
+            prompt_version TEXT NOT NULL,
+            body BLOB NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (state, soil_type, district, prompt_version)
+        )
+    """,)
+
+    def has(self, state, soil_type, district, prompt_version):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM recommendations WHERE state = ? AND soil_type = ? AND district = ? AND prompt_version = ?",
+                (*_key(state, soil_type, district), prompt_version)
+            ).fetchone()
+        return row is not None
+
+    def put(self, state, soil_type, district, prompt_version, text):
+        """Store one recommendation; committed immediately so interrupted runs can resume"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO recommendations VALUES (?, ?, ?, ?, ?, ?)",
+                (*_key(state, soil_type, district), prompt_version,
+                 zlib.compress(text.encode("utf-8"), 9), time.time())
+            )
+            self._conn.commit()
+
+    def load(self, prompt_version):
+        """Return an in-memory snapshot {key: compressed body} for serving"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, soil_type, district, body FROM recommendations WHERE prompt_version = ?",
+                (prompt_version,)
+            ).fetchall()
+        return {(state, soil_type, district): body for state, soil_type, district, body in rows}
+
+
+def load_recommendations(path, prompt_version):
+    """Load a precomputed store into memory; returns an empty table if it doesn't exist"""
+    if not os.path.exists(path):
+        return {}
+    store = RecommendationStore(path)
+    try:
+        return store.load(prompt_version)
+    finally:
+        store.close()
+
+def lookup_recommendation(table, state, soil_type, district=""):
+    """Return the precomputed recommendation text, or None if it wasn't precomputed"""
+    body = table.get(_key(state, soil_type, district))
+    if body is None:
+        return None
+    return zlib.decompress(body).decode("utf-8")
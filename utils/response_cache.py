@@ -0,0 +1,141 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+# Access times are only rewritten when older than this, so hot keys don't
+# turn every read into a write
+TOUCH_INTERVAL = 60
+# Check the total size once every this many writes per process
+EVICT_EVERY = 50
+
+
+def make_key(model_name, prompt, image_digest="", version=""):
+    """Stable cache key over the model, normalized prompt, image digest and template version"""
+    normalized = " ".join(prompt.split())
+    h = hashlib.sha256()
+    for part in (model_name, version, image_digest, normalized):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResponseCache:
+    """Disk-backed response cache shared by every process on the host.
+
+    SQLite in WAL mode lets readers proceed while another process writes.
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted once the stored text exceeds `max_bytes`.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, ttl=7 * 24 * 3600):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        self._counter_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def _connection(self):
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, stale=False):
+        """Cached body for key; stale=True also returns an expired entry, as a fallback while the upstream is down"""
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT body, created_at, accessed_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        
+        # Expired rows are left for evict(), so they can still serve stale lookups until then
+        if row is None or (now - row[1] > self.ttl and not stale):
+            with self._counter_lock:
+                self.misses += 1
+            return None
+        
+        if now - row[2] > TOUCH_INTERVAL:
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        with self._counter_lock:
+            self.hits += 1
+        return row[0]
+
+    def set(self, key, body):
+        conn = self._connection()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+            (key, body, len(body.encode("utf-8")), now, now)
+        )
+        
+        with self._counter_lock:
+            self._writes += 1
+            due = self._writes % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                # Trim to 90% so eviction doesn't run on every subsequent write
+                excess = total - int(self.max_bytes * 0.9)
+                for key, size in conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at"
+                ).fetchall():
+                    if excess <= 0:
+                        break
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    excess -= size
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self._connection().execute("DELETE FROM responses")
+
+    def stats(self):
+        conn = self._connection()
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        with self._counter_lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": count,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
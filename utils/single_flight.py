@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls so only one reaches the upstream.
+
+    Callers that arrive while a call for the same key is in flight wait for
+    it and share its result (or exception) instead of issuing their own.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._async_calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, coro_fn):
+        """Async counterpart of do; calls are only coalesced within one event loop.
+        
+        If the leading call is cancelled, waiting callers see the cancellation too.
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            future = self._async_calls.get(flight_key)
+            leader = future is None
+            if leader:
+                future = self._async_calls[flight_key] = loop.create_future()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            # shield: one follower being cancelled must not cancel the shared call
+            return await asyncio.shield(future)
+        
+        try:
+            result = await coro_fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an exception nobody else awaited isn't logged
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                self._async_calls.pop(flight_key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._async_calls),
+            }
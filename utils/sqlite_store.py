@@ -0,0 +1,33 @@
+import os
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """One SQLite connection shared by every thread of a process behind a lock.
+
+    Subclasses list their CREATE statements in SCHEMA. WAL mode lets another
+    process (the app reading what a batch job writes) read while this one
+    writes; synchronous=NORMAL is durable across application crashes and only
+    risks the last commits on power loss, which suits caches and job state.
+    """
+
+    SCHEMA = ()
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                self._conn.execute(statement)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,76 @@
+import math
+
+
+TEMPERATURE_BAND_WIDTH = 3
+HUMIDITY_EDGES = [(40, "low"), (60, "moderate"), (80, "high")]
+RAIN_EDGES = [(0, "none"), (5, "light")]
+WIND_EDGES = [(1.5, "calm"), (5.5, "breeze"), (10.8, "windy")]
+
+HUMIDITY_RANGES = {"low": "40% or below", "moderate": "40-60%", "high": "60-80%", "very high": "above 80%"}
+RAIN_RANGES = {"none": "no recent rain", "light": "light rain (up to 5 mm in the last hour)",
+               "heavy": "heavy rain (over 5 mm in the last hour)"}
+WIND_RANGES = {"calm": "calm (up to 1.5 m/s)", "breeze": "light breeze (1.5-5.5 m/s)",
+               "windy": "windy (5.5-10.8 m/s)", "strong": "strong wind (above 10.8 m/s)"}
+
+# OpenWeather "main" groups collapsed into a handful of sky classes
+SKY_CLASSES = {
+    "clear": "clear",
+    "clouds": "cloudy",
+    "drizzle": "rain",
+    "rain": "rain",
+    "thunderstorm": "thunderstorm",
+    "snow": "snow",
+    "mist": "haze", "smoke": "haze", "haze": "haze", "dust": "haze",
+    "fog": "haze", "sand": "haze", "ash": "haze",
+    "squall": "storm", "tornado": "storm"
+}
+
+
+def _classify(value, edges, top):
+    for edge, label in edges:
+        if value <= edge:
+            return label
+    return top
+
+def _sky_class(weather):
+    main = str(weather.get("main", "")).lower()
+    if main in SKY_CLASSES:
+        return SKY_CLASSES[main]
+    description = str(weather.get("description", "")).lower()
+    for keyword, sky in SKY_CLASSES.items():
+        if keyword in description:
+            return sky
+    return "clear" if not description else "other"
+
+def quantize_weather(weather_data):
+    """Map an OpenWeather payload onto discrete condition bands.
+
+    Returns a hashable tuple (temp_band_start, humidity, rain, wind, sky).
+    Nearby locations with practically identical weather map to the same tuple.
+    """
+    main = weather_data.get("main", {})
+    temp = main.get("temp", 0) or 0
+    humidity = main.get("humidity", 0) or 0
+    rainfall = weather_data.get("rain", {}).get("1h", 0) if weather_data.get("rain") else 0
+    wind_speed = weather_data.get("wind", {}).get("speed", 0) or 0
+    weather = (weather_data.get("weather") or [{}])[0]
+    
+    temp_band = int(math.floor(temp / TEMPERATURE_BAND_WIDTH) * TEMPERATURE_BAND_WIDTH)
+    return (
+        temp_band,
+        _classify(humidity, HUMIDITY_EDGES, "very high"),
+        _classify(rainfall, RAIN_EDGES, "heavy"),
+        _classify(wind_speed, WIND_EDGES, "strong"),
+        _sky_class(weather)
+    )
+
+def describe_bands(bands):
+    """Human-readable description of a quantize_weather tuple for prompts"""
+    temp_band, humidity, rain, wind, sky = bands
+    return {
+        "temperature": f"{temp_band} to {temp_band + TEMPERATURE_BAND_WIDTH}°C",
+        "humidity": HUMIDITY_RANGES[humidity],
+        "rain": RAIN_RANGES[rain],
+        "wind": WIND_RANGES[wind],
+        "sky": sky
+    }
@@ -1,85 +1,567 @@
-import requests
-from config import OPENWEATHER_API_KEY
-from datetime import datetime
+import asyncio
+import importlib
+import json
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from config import (
+    GEMINI_API_KEY,
+    OPENWEATHER_API_KEY,
+    OPENWEATHER_BASE_URL,
+    WEATHER_CACHE_TTL,
+    WEATHER_NEGATIVE_CACHE_TTL,
+    WEATHER_CACHE_MAXSIZE,
+    WEATHER_POOL_SIZE,
+    WEATHER_CONNECT_TIMEOUT,
+    WEATHER_READ_TIMEOUT,
+    WEATHER_MAX_RETRIES,
+    WEATHER_BACKOFF_BASE,
+    WEATHER_BACKOFF_MAX,
+    WEATHER_RPM,
+    FORECAST_CACHE_TTL,
+    FORECAST_CACHE_MAXSIZE
+)
+from datetime import datetime, timezone
 
 
 try:
-    from utils.gemini_service import get_crop_specific_weather_recommendations
+    from utils.gemini_service import (
+        get_crop_specific_weather_recommendations,
+        get_crop_specific_weather_recommendations_stream,
+        get_crop_specific_weather_recommendations_async
+    )
+    from utils.cache import TTLCache
+    from utils.metrics import (
+        cache_gauges, instrument, limiter_gauges, propagate, record_bytes, record_error,
+        record_upstream, register_collector, single_flight_gauges
+    )
+    from utils.rate_limit import RateLimiter
+    from utils.single_flight import SingleFlight
 except ImportError:
     
-    from gemini_service import get_crop_specific_weather_recommendations
+    from gemini_service import (
+        get_crop_specific_weather_recommendations,
+        get_crop_specific_weather_recommendations_stream,
+        get_crop_specific_weather_recommendations_async
+    )
+    from cache import TTLCache
+    from metrics import (
+        cache_gauges, instrument, limiter_gauges, propagate, record_bytes, record_error,
+        record_upstream, register_collector, single_flight_gauges
+    )
+    from rate_limit import RateLimiter
+    from single_flight import SingleFlight
 
-def get_weather_data(city_name, state=""):
-    """Get weather data from OpenWeather API"""
+
+def _lazy(name):
+    """Import a sibling module on first use; crop_rules, forecast and gazetteer pull in NumPy/pandas"""
+    try:
+        return importlib.import_module(f"utils.{name}")
+    except ImportError:
+        return importlib.import_module(name)
+
+
+_weather_cache = TTLCache(maxsize=WEATHER_CACHE_MAXSIZE, ttl=WEATHER_CACHE_TTL)
+_forecast_cache = TTLCache(maxsize=FORECAST_CACHE_MAXSIZE, ttl=FORECAST_CACHE_TTL)
+# OpenWeather endpoint -> cache holding its parsed results
+_endpoint_caches = {"weather": _weather_cache, "forecast": _forecast_cache}
+_weather_limiter = RateLimiter(WEATHER_RPM)
+# Concurrent lookups of the same location share one upstream call
+_weather_flight = SingleFlight()
+
+def _normalize_location(city_name, state=""):
+    """Build a cache key that ignores case and stray whitespace"""
+    city = " ".join(str(city_name or "").split()).lower()
+    state = " ".join(str(state or "").split()).lower()
+    return city, state
+
+def get_weather_cache_stats():
+    """Return hit/miss counters for the weather lookup cache"""
+    return _weather_cache.stats()
+
+def get_forecast_cache_stats():
+    return _forecast_cache.stats()
+
+def clear_weather_cache():
+    _weather_cache.clear()
+    _forecast_cache.clear()
+
+def get_weather_quota_stats():
+    """Return queue depth and wait times of the OpenWeather rate limit, plus coalescing counts"""
+    return {
+        "requests": _weather_limiter.stats(),
+        "single_flight": _weather_flight.stats()
+    }
+
+def _collect_metrics():
+    yield from cache_gauges("weather", _weather_cache.stats())
+    yield from cache_gauges("forecast", _forecast_cache.stats())
+    yield from limiter_gauges("openweather", _weather_limiter.stats())
+    yield from single_flight_gauges("openweather", _weather_flight.stats())
+
+register_collector(_collect_metrics)
+
+# Statuses worth retrying: rate limiting and transient upstream failures
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+# aiohttp sessions are bound to the event loop that created them
+_async_sessions = weakref.WeakKeyDictionary()
+
+def get_http_session():
+    """Return the shared keep-alive session used for all OpenWeather calls"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=WEATHER_POOL_SIZE,
+                    pool_maxsize=WEATHER_POOL_SIZE,
+                    max_retries=0
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+async def get_async_http_session():
+    """Return the pooled aiohttp session for the running event loop"""
+    import aiohttp
+    
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=WEATHER_POOL_SIZE),
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=WEATHER_CONNECT_TIMEOUT,
+                sock_read=WEATHER_READ_TIMEOUT
+            )
+        )
+        _async_sessions[loop] = session
+    return session
+
+async def close_async_http_session():
+    """Close the running loop's aiohttp session; call before the loop shuts down"""
+    session = _async_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+def _parse_retry_after(value):
+    """Convert a Retry-After header (seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def _backoff_delay(attempt, response=None):
+    """Full-jitter exponential backoff, deferring to Retry-After when present"""
+    if response is not None:
+        retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, WEATHER_BACKOFF_MAX)
+    return random.uniform(0, min(WEATHER_BACKOFF_MAX, WEATHER_BACKOFF_BASE * (2 ** attempt)))
+
+def _get_with_retry(url, params):
+    """GET through the shared session, retrying transient failures"""
+    import requests
+    
+    session = get_http_session()
+    timeout = (WEATHER_CONNECT_TIMEOUT, WEATHER_READ_TIMEOUT)
+    
+    for attempt in range(WEATHER_MAX_RETRIES + 1):
+        last_attempt = attempt == WEATHER_MAX_RETRIES
+        _weather_limiter.acquire()
+        start = time.perf_counter()
+        try:
+            response = session.get(url, params=params, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            record_upstream("openweather", time.perf_counter() - start, type(e).__name__)
+            if last_attempt:
+                raise
+            time.sleep(_backoff_delay(attempt))
+            continue
+        record_upstream("openweather", time.perf_counter() - start, response.status_code)
+        record_bytes("openweather", "download", len(response.content))
+        
+        if response.status_code in RETRYABLE_STATUSES and not last_attempt:
+            delay = _backoff_delay(attempt, response)
+            response.close()
+            time.sleep(delay)
+            continue
+        return response
+
+async def _get_with_retry_async(url, params):
+    """Async counterpart of _get_with_retry; returns (status, body text)"""
+    import aiohttp
+    
+    session = await get_async_http_session()
+    
+    for attempt in range(WEATHER_MAX_RETRIES + 1):
+        last_attempt = attempt == WEATHER_MAX_RETRIES
+        await _weather_limiter.acquire_async()
+        start = time.perf_counter()
+        try:
+            async with session.get(url, params=params) as response:
+                body = await response.read()
+                record_upstream("openweather", time.perf_counter() - start, response.status)
+                record_bytes("openweather", "download", len(body))
+                if response.status in RETRYABLE_STATUSES and not last_attempt:
+                    delay = _backoff_delay(attempt, response)
+                else:
+                    return response.status, body.decode(response.get_encoding())
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            record_upstream("openweather", time.perf_counter() - start, type(e).__name__)
+            if last_attempt:
+                raise
+            delay = _backoff_delay(attempt)
+        await asyncio.sleep(delay)
+
+def _weather_query(city_name, state=""):
+    """Return (cache_key, params) for a city; gazetteer hits are queried by coordinates"""
+    place = _lazy("gazetteer").get_gazetteer().resolve(city_name, state)
+    if place is not None:
+        return _coords_query(place.lat, place.lon)
+    query = f"{city_name}, {state}, India" if state else f"{city_name}, India"
+    return _normalize_location(city_name, state), {"q": query}
+
+def _coords_query(lat, lon):
+    """Return (cache_key, params) for a coordinate lookup; ~1 km precision shares cache entries"""
+    lat, lon = round(float(lat), 2), round(float(lon), 2)
+    return ("coords", lat, lon), {"lat": lat, "lon": lon}
+
+def _location_query(location):
+    """Accept either a (city, state) or a (lat, lon) pair"""
+    first, second = location
+    if isinstance(first, (int, float)) and isinstance(second, (int, float)):
+        return _coords_query(first, second)
+    return _weather_query(first, second)
+
+def _weather_url_params(params, endpoint="weather"):
+    return f"{OPENWEATHER_BASE_URL}/data/2.5/{endpoint}", dict(params, appid=OPENWEATHER_API_KEY, units="metric")
+
+def _weather_result(cache_key, status, text, endpoint="weather"):
+    """Turn an OpenWeather response into (data, error), caching it where appropriate"""
+    cache = _endpoint_caches[endpoint]
+    if status == 200:
+        data = json.loads(text)
+        if endpoint == "forecast":
+            data = _lazy("forecast").ForecastSeries.from_openweather(data)
+        cache.set(cache_key, (data, None))
+        return data, None
+    elif status == 404:
+        # Unknown city: remember the failure so repeated typos don't burn quota
+        record_error(f"HTTP{status}")
+        result = (None, f"Error: {status} - {text}")
+        cache.set(cache_key, result, ttl=WEATHER_NEGATIVE_CACHE_TTL)
+        return result
+    else:
+        record_error(f"HTTP{status}")
+        return None, f"Error: {status} - {text}"
+
+def _fetch_uncached(cache_key, params, endpoint="weather"):
+    """Fetch from OpenWeather, sharing the call with concurrent identical lookups"""
+    def fetch():
+        url, query = _weather_url_params(params, endpoint)
+        response = _get_with_retry(url, query)
+        return _weather_result(cache_key, response.status_code, response.text, endpoint)
+    
+    try:
+        return _weather_flight.do((endpoint, cache_key), fetch)
+    except Exception as e:
+        record_error(e)
+        return None, f"Error fetching weather: {str(e)}"
+
+def _fetch_weather(cache_key, params, endpoint="weather"):
+    if not OPENWEATHER_API_KEY:
+        return None, "Please set your OPENWEATHER_API_KEY in the .env file"
+    
+    cached = _endpoint_caches[endpoint].get(cache_key)
+    if cached is not None:
+        return cached
+    return _fetch_uncached(cache_key, params, endpoint)
+
+async def _fetch_weather_async(cache_key, params, timeout=None, endpoint="weather"):
     try:
         if not OPENWEATHER_API_KEY:
             return None, "Please set your OPENWEATHER_API_KEY in the .env file"
         
+        cached = _endpoint_caches[endpoint].get(cache_key)
+        if cached is not None:
+            return cached
         
-        query = f"{city_name}, {state}, India" if state else f"{city_name}, India"
-        
-        url = f"http://api.openweathermap.org/data/2.5/weather"
-        params = {
-            "q": query,
-            "appid": OPENWEATHER_API_KEY,
-            "units": "metric"
-        }
+        async def fetch():
+            url, query = _weather_url_params(params, endpoint)
+            status, text = await _get_with_retry_async(url, query)
+            return _weather_result(cache_key, status, text, endpoint)
         
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data, None
-        else:
-            return None, f"Error: {response.status_code} - {response.text}"
+        return await asyncio.wait_for(_weather_flight.do_async((endpoint, cache_key), fetch), timeout)
+    except asyncio.TimeoutError:
+        record_error("TimeoutError")
+        return None, "Error fetching weather: request timed out"
     except Exception as e:
+        record_error(e)
         return None, f"Error fetching weather: {str(e)}"
 
-def get_weather_recommendations(crop_name, weather_data):
-    """Generate weather-based recommendations for crops"""
+@instrument
+def get_weather_data(city_name, state=""):
+    """Get weather data from OpenWeather API, served from cache when fresh.
+
+    Cities found in the offline gazetteer are looked up by coordinates, which
+    skips server-side geocoding and shares cache entries across spellings.
+    """
+    try:
+        query = _weather_query(city_name, state)
+    except Exception as e:
+        record_error(e)
+        return None, f"Error fetching weather: {str(e)}"
+    return _fetch_weather(*query)
+
+@instrument
+def get_weather_by_coords(lat, lon):
+    """Get weather data for a latitude/longitude, served from cache when fresh"""
+    try:
+        return _fetch_weather(*_coords_query(lat, lon))
+    except (TypeError, ValueError) as e:
+        record_error(e)
+        return None, f"Error fetching weather: {str(e)}"
+
+@instrument
+def get_forecast(city_name, state=""):
+    """Get the 5-day / 3-hour forecast as a ForecastSeries, served from cache when fresh"""
+    try:
+        query = _weather_query(city_name, state)
+    except Exception as e:
+        record_error(e)
+        return None, f"Error fetching forecast: {str(e)}"
+    return _fetch_weather(*query, endpoint="forecast")
+
+@instrument
+def get_forecast_by_coords(lat, lon):
+    """Coordinate counterpart of get_forecast"""
+    try:
+        return _fetch_weather(*_coords_query(lat, lon), endpoint="forecast")
+    except (TypeError, ValueError) as e:
+        record_error(e)
+        return None, f"Error fetching forecast: {str(e)}"
+
+@instrument
+async def get_weather_data_async(city_name, state="", timeout=None):
+    """Async counterpart of get_weather_data with an optional overall deadline in seconds"""
+    try:
+        # The first lookup loads and indexes the gazetteer CSV, so keep it off the event loop
+        query = await asyncio.to_thread(_weather_query, city_name, state)
+    except Exception as e:
+        record_error(e)
+        return None, f"Error fetching weather: {str(e)}"
+    return await _fetch_weather_async(*query, timeout)
+
+WEATHER_COLUMNS = [
+    "city", "state", "lat", "lon", "temp", "feels_like", "temp_min", "temp_max",
+    "humidity", "pressure", "wind_speed", "rain_1h", "description", "error"
+]
+
+def _weather_row(location, data, error):
+    first, second = location
+    by_coords = isinstance(first, (int, float)) and isinstance(second, (int, float))
+    data = data or {}
+    main = data.get("main", {})
+    coord = data.get("coord", {})
+    return (
+        data.get("name") if by_coords else first,
+        None if by_coords else second,
+        first if by_coords else coord.get("lat"),
+        second if by_coords else coord.get("lon"),
+        main.get("temp"),
+        main.get("feels_like"),
+        main.get("temp_min"),
+        main.get("temp_max"),
+        main.get("humidity"),
+        main.get("pressure"),
+        data.get("wind", {}).get("speed"),
+        data.get("rain", {}).get("1h", 0) if data else None,
+        (data.get("weather") or [{}])[0].get("description"),
+        error
+    )
+
+@instrument
+def get_weather_many(locations, max_workers=WEATHER_POOL_SIZE):
+    """Fetch current weather for many locations at once.
+    
+    Locations are (city, state) or (lat, lon) pairs. Duplicates are fetched
+    once, fresh cache entries are served without a request, and the rest are
+    fetched concurrently over the pooled session. Returns one (data, error)
+    pair per input location, in input order.
+    """
+    queries = []
+    results = {}
+    for location in locations:
+        try:
+            queries.append(_location_query(location))
+        except Exception as e:
+            # A bad location fails on its own; the key is unique so it never reaches the fetch loop
+            record_error(e)
+            cache_key = ("invalid", len(queries))
+            results[cache_key] = (None, f"Error fetching weather: {str(e)}")
+            queries.append((cache_key, None))
+    
+    unique = {}
+    for cache_key, params in queries:
+        if cache_key not in results:
+            unique.setdefault(cache_key, params)
+    
+    pending = []
+    for cache_key, params in unique.items():
+        if not OPENWEATHER_API_KEY:
+            results[cache_key] = (None, "Please set your OPENWEATHER_API_KEY in the .env file")
+            continue
+        cached = _weather_cache.get(cache_key)
+        if cached is not None:
+            results[cache_key] = cached
+        else:
+            pending.append((cache_key, params))
+    
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+            fetched = executor.map(propagate(lambda item: _fetch_uncached(*item)), pending)
+            for (cache_key, _), result in zip(pending, fetched):
+                results[cache_key] = result
+    
+    return [results[cache_key] for cache_key, _ in queries]
+
+@instrument
+def get_weather_bulk(locations, max_workers=WEATHER_POOL_SIZE):
+    """get_weather_many as a DataFrame with one row per input location, in input order"""
+    results = get_weather_many(locations, max_workers)
+    rows = [_weather_row(location, *result) for location, result in zip(locations, results)]
+    import pandas as pd
+    
+    return pd.DataFrame(rows, columns=WEATHER_COLUMNS)
+
+def _with_outlook(text, forecast):
+    outlook = get_forecast_recommendations(forecast)
+    return f"{text}\n\n{outlook}" if outlook else text
+
+def _ai_unavailable(text):
+    """True when the Gemini helper returned a setup or error message instead of advice"""
+    return text.startswith(("Please set your GEMINI_API_KEY", "Error generating recommendations"))
+
+@instrument
+def get_weather_recommendations(crop_name, weather_data, forecast=None, failures=None):
+    """Generate weather-based recommendations for crops, plus a forecast outlook if given.
+    
+    Without Gemini, or when the AI call fails, the crop threshold rules answer instead.
+    A failed AI call is appended to the optional failures list, so callers can
+    tell that fallback apart from rules-only operation.
+    """
     if not weather_data:
         return "Weather data not available"
     
     
-    if crop_name:
+    if crop_name and GEMINI_API_KEY:
         try:
-            return get_crop_specific_weather_recommendations(crop_name, weather_data)
+            text = get_crop_specific_weather_recommendations(crop_name, weather_data)
+            if not _ai_unavailable(text):
+                return _with_outlook(text, forecast)
+            if failures is not None:
+                failures.append(RuntimeError(text))
         except Exception as e:
-            
-            return f"Error getting AI recommendations: {str(e)}\n\n{get_generic_weather_recommendations(weather_data)}"
+            if failures is not None:
+                failures.append(e)
     
     
-    return get_generic_weather_recommendations(weather_data)
+    return _with_outlook(get_generic_weather_recommendations(weather_data, crop_name), forecast)
 
-def get_generic_weather_recommendations(weather_data):
-    """Generate generic weather-based recommendations"""
-    temp = weather_data.get("main", {}).get("temp", 0)
-    humidity = weather_data.get("main", {}).get("humidity", 0)
-    rainfall = weather_data.get("rain", {}).get("1h", 0) if weather_data.get("rain") else 0
-    description = weather_data.get("weather", [{}])[0].get("description", "")
-    wind_speed = weather_data.get("wind", {}).get("speed", 0)
+@instrument
+async def get_weather_recommendations_async(crop_name, weather_data, timeout=None, forecast=None):
+    """Async counterpart of get_weather_recommendations"""
+    if not weather_data:
+        return "Weather data not available"
     
-    recommendations = []
+    if crop_name and GEMINI_API_KEY:
+        text = await get_crop_specific_weather_recommendations_async(crop_name, weather_data, timeout)
+        if not _ai_unavailable(text):
+            return _with_outlook(text, forecast)
     
+    return _with_outlook(get_generic_weather_recommendations(weather_data, crop_name), forecast)
+
+@instrument
+def get_weather_recommendations_stream(crop_name, weather_data, forecast=None):
+    """Streaming variant of get_weather_recommendations that yields text chunks"""
+    if not weather_data:
+        yield "Weather data not available"
+        return
     
-    if temp < 15:
-        recommendations.append("⚠️ Low temperature detected. Protect crops from frost. Consider covering sensitive crops.")
-    elif temp > 35:
-        recommendations.append("🔥 High temperature. Ensure adequate irrigation. Mulching can help retain moisture.")
-    else:
-        recommendations.append("✅ Temperature is suitable for most crops.")
+    fallback = not (crop_name and GEMINI_API_KEY)
+    if not fallback:
+        for i, chunk in enumerate(get_crop_specific_weather_recommendations_stream(crop_name, weather_data)):
+            if i == 0 and _ai_unavailable(chunk):
+                fallback = True
+                break
+            yield chunk
+    if fallback:
+        yield get_generic_weather_recommendations(weather_data, crop_name)
     
+    outlook = get_forecast_recommendations(forecast)
+    if outlook:
+        yield f"\n\n{outlook}"
+
+def get_forecast_recommendations(forecast):
+    """Irrigation and spraying advice from the upcoming forecast; empty if there is none"""
+    if forecast is None or not len(forecast):
+        return ""
+    
+    summary = forecast.summary()
+    rain_24h = summary["rain_next_24h_mm"]
+    rain_72h = summary["rain_next_72h_mm"]
+    max_temp = summary["max_temp_next_3d"]
+    min_temp = summary["min_temp_next_3d"]
+    max_wind = summary["max_wind_next_24h"]
     
-    if humidity > 80:
-        recommendations.append("💧 High humidity. Watch for fungal diseases. Ensure proper ventilation.")
-    elif humidity < 40:
-        recommendations.append("🌵 Low humidity. Increase irrigation frequency if needed.")
+    recommendations = ["📅 Forecast outlook:"]
     
+    if rain_24h >= 2:
+        recommendations.append(f"🌧️ About {rain_24h:.0f} mm of rain expected in the next 24 hours. Postpone irrigation and avoid spraying pesticides or fertilizer.")
+    elif rain_72h < 1 and max_temp is not None and max_temp >= 35:
+        recommendations.append(f"☀️ Dry and hot days ahead (up to {max_temp:.0f}°C). Irrigate in the early morning or evening.")
     
-    if rainfall > 5:
-        recommendations.append("🌧️ Recent rainfall. Ensure proper drainage to prevent waterlogging.")
+    if max_temp is not None and max_temp >= 38:
+        recommendations.append("🔥 Heat stress likely in the next 3 days. Keep soil moist and consider shade for nurseries.")
+    if min_temp is not None and min_temp <= 5:
+        recommendations.append(f"❄️ Temperatures may drop to {min_temp:.0f}°C. Prepare frost protection for sensitive crops.")
+    if max_wind is not None and max_wind >= 10:
+        recommendations.append("💨 Strong winds expected. Avoid spraying and support tall or fruiting plants.")
     
-    recommendations.append("\n💡 Tip: Select a specific crop to get personalized recommendations!")
+    if len(recommendations) == 1:
+        recommendations.append("✅ No major weather risks expected in the next few days.")
+    
+    return "\n".join(recommendations)
+
+@instrument
+def get_generic_weather_recommendations(weather_data, crop_name=None):
+    """Generate rule-based weather recommendations, crop-aware when a crop is given"""
+    recommendations = _lazy("crop_rules").rule_based_advice(crop_name, weather_data)
+    
+    if not crop_name:
+        recommendations.append("\n💡 Tip: Select a specific crop to get personalized recommendations!")
     
     return "\n".join(recommendations)
 
@@ -107,3 +589,23 @@ def format_weather_info(weather_data):
     
     return info
 
+def format_forecast_info(forecast):
+    """Format forecast highlights for display"""
+    if forecast is None or not len(forecast):
+        return "Forecast not available"
+    
+    summary = forecast.summary()
+    
+    def fmt(value, unit):
+        return "N/A" if value is None else f"{value:.1f}{unit}"
+    
+    info = f"""
+    **Next 3 Days:**
+    - Rain (next 24h): {fmt(summary['rain_next_24h_mm'], ' mm')}
+    - Rain (next 72h): {fmt(summary['rain_next_72h_mm'], ' mm')}
+    - Max Temperature: {fmt(summary['max_temp_next_3d'], '°C')}
+    - Min Temperature: {fmt(summary['min_temp_next_3d'], '°C')}
+    - Max Wind (next 24h): {fmt(summary['max_wind_next_24h'], ' m/s')}
+    """
+    
+    return info